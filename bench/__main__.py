@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+
+def write_results(path: str, kind: str, results: dict, args: argparse.Namespace):
+    payload = {
+        "kind": kind,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "args": {key: value for key, value in vars(args).items() if key != "func"},
+        "results": results,
+    }
+    Path(path).write_text(json.dumps(payload, indent=2) + "\n")
+    print(f"Wrote {path}")
+
+
+async def run_generate(args):
+    from bench.datagen import generate
+    from database import engine
+
+    summary = await generate(args.events, args.bets, args.wallets, args.skew, args.seed)
+    await engine.dispose()
+    print(f"Generated {summary['events']} events, {summary['bets']} bets, {summary['wallets']} wallets")
+
+
+async def run_load_command(args):
+    import httpx
+
+    from bench.load import run_load
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=30) as client:
+            return await run_load(client, args.scenario, args.duration, args.concurrency, args.seed)
+
+    from main import app, lifespan
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_load(client, args.scenario, args.duration, args.concurrency, args.seed)
+
+
+def load(args):
+    results = asyncio.run(run_load_command(args))
+    for name, endpoint in results["endpoints"].items():
+        print(
+            f"{name:<24} n={endpoint['count']:<7} err={endpoint['errors']:<5} "
+            f"p50={endpoint['p50_ms']:8.2f}ms p95={endpoint['p95_ms']:8.2f}ms "
+            f"p99={endpoint['p99_ms']:8.2f}ms"
+        )
+    print(f"total throughput: {results['throughput_rps']:.1f} req/s")
+    write_results(args.output, "load", results, args)
+
+
+def schemas(args):
+    from bench.schemas import run_schemas
+
+    results = run_schemas(repeat=args.repeat, number=args.number)
+    for name, result in results.items():
+        print(f"{name:<32} {result['ns_per_op']:12.0f} ns/op")
+    write_results(args.output, "schemas", results, args)
+
+
+def compare(args):
+    from bench.compare import compare as compare_results, format_table
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    rows, regressed = compare_results(
+        baseline["results"], current["results"], args.threshold
+    )
+    print(format_table(rows))
+    if regressed:
+        print(f"Regressions above {args.threshold}% detected")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench")
+    commands = parser.add_subparsers(required=True)
+
+    generate = commands.add_parser("generate", help="populate DATABASE_URL with synthetic data")
+    generate.add_argument("--events", type=int, default=1000)
+    generate.add_argument("--bets", type=int, default=100000)
+    generate.add_argument("--wallets", type=int, default=5000)
+    generate.add_argument("--skew", type=float, default=1.1, help="zipf exponent for events and wallets")
+    generate.add_argument("--seed", type=int, default=0)
+    generate.set_defaults(func=lambda args: asyncio.run(run_generate(args)))
+
+    load_parser = commands.add_parser("load", help="drive mixed traffic and report latencies")
+    load_parser.add_argument("--url", help="base URL of a running server; defaults to in-process")
+    load_parser.add_argument("--scenario", default="mixed", choices=["read-heavy", "mixed", "write-heavy"])
+    load_parser.add_argument("--duration", type=float, default=30)
+    load_parser.add_argument("--concurrency", type=int, default=32)
+    load_parser.add_argument("--seed", type=int, default=0)
+    load_parser.add_argument("--output", default="bench-load.json")
+    load_parser.set_defaults(func=load)
+
+    schemas_parser = commands.add_parser("schemas", help="microbenchmark the pydantic schemas")
+    schemas_parser.add_argument("--repeat", type=int, default=5)
+    schemas_parser.add_argument("--number", type=int, default=2000)
+    schemas_parser.add_argument("--output", default="bench-schemas.json")
+    schemas_parser.set_defaults(func=schemas)
+
+    compare_parser = commands.add_parser("compare", help="compare a result file against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10, help="allowed regression in percent")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
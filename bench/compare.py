@@ -0,0 +1,54 @@
+LOWER_IS_BETTER = ("_ms", "ns_per_op", "errors", "elapsed_s")
+HIGHER_IS_BETTER = ("throughput_rps",)
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def direction(metric: str) -> int:
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> tuple[list[dict], bool]:
+    baseline, current = flatten(baseline), flatten(current)
+    rows, regressed = [], False
+    for metric in sorted(baseline.keys() & current.keys()):
+        better = direction(metric)
+        if not better:
+            continue
+        before, after = baseline[metric], current[metric]
+        change = (after - before) / before * 100 if before else 0.0
+        is_regression = -better * change > threshold
+        regressed = regressed or is_regression
+        rows.append({
+            "metric": metric,
+            "baseline": before,
+            "current": after,
+            "change_pct": change,
+            "regression": is_regression,
+        })
+    return rows, regressed
+
+
+def format_table(rows: list[dict]) -> str:
+    width = max((len(row["metric"]) for row in rows), default=6)
+    lines = [f"{'metric':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}"]
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        lines.append(
+            f"{row['metric']:<{width}}  {row['baseline']:>12.3f}  {row['current']:>12.3f}"
+            f"  {row['change_pct']:>+7.1f}%{flag}"
+        )
+    return "\n".join(lines)
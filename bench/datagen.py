@@ -0,0 +1,70 @@
+import random
+import string
+from itertools import accumulate
+
+from sqlalchemy import insert
+
+from database import Bet, Event, AsyncSessionLocal, upgrade_schema
+from stats import rebuild_event_stats, rebuild_wallet_stats
+
+INSERT_CHUNK_SIZE = 5000
+
+
+def zipf_cum_weights(count: int, skew: float) -> list[float]:
+    return list(accumulate(1 / (rank ** skew) for rank in range(1, count + 1)))
+
+
+def wallet_address(rng: random.Random) -> str:
+    return "0x" + "".join(rng.choices("0123456789abcdef", k=40))
+
+
+def event_rows(count: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "request_id": f"bench-{index:08d}",
+            "title": f"Benchmark event {index}",
+            "description": "".join(rng.choices(string.ascii_letters + " ", k=120)),
+            "due_date": 1725000000 + index * 3600,
+            "predict": {"price": str(rng.randint(1000, 5000)), "symbol": "ETH"},
+            "contracts": None,
+        }
+        for index in range(count)
+    ]
+
+
+def bet_rows(event_ids: list[str], wallets: list[str], count: int, skew: float, rng: random.Random):
+    bet_event_ids = rng.choices(event_ids, cum_weights=zipf_cum_weights(len(event_ids), skew), k=count)
+    bet_wallets = rng.choices(wallets, cum_weights=zipf_cum_weights(len(wallets), skew), k=count)
+    for event_request_id, wallet in zip(bet_event_ids, bet_wallets):
+        yield {
+            "event_request_id": event_request_id,
+            "wallet_address": wallet,
+            "prediction": rng.choice(("YES", "NO")),
+            "tokens": round(rng.lognormvariate(3, 1.5), 6),
+            "token_name": rng.choice(("USDC", "USDC", "USDC", "WETH")),
+        }
+
+
+async def generate(events: int, bets: int, wallets: int, skew: float = 1.1, seed: int = 0):
+    rng = random.Random(seed)
+    await upgrade_schema()
+    event_data = event_rows(events, rng)
+    event_ids = [event["request_id"] for event in event_data]
+    wallet_data = [wallet_address(rng) for _ in range(wallets)]
+
+    async with AsyncSessionLocal() as db:
+        for start in range(0, len(event_data), INSERT_CHUNK_SIZE):
+            await db.execute(insert(Event), event_data[start:start + INSERT_CHUNK_SIZE])
+        chunk = []
+        for bet in bet_rows(event_ids, wallet_data, bets, skew, rng):
+            chunk.append(bet)
+            if len(chunk) == INSERT_CHUNK_SIZE:
+                await db.execute(insert(Bet), chunk)
+                chunk = []
+        if chunk:
+            await db.execute(insert(Bet), chunk)
+        await rebuild_event_stats(db)
+        await rebuild_wallet_stats(db)
+        await db.commit()
+
+    return {"events": len(event_ids), "bets": bets, "wallets": len(wallet_data)}
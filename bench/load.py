@@ -0,0 +1,159 @@
+import asyncio
+import random
+import time
+from collections import defaultdict
+
+import httpx
+
+SCENARIOS = {
+    "read-heavy": {
+        "get_event": 25,
+        "get_event_statistics": 20,
+        "get_bets_for_event": 10,
+        "get_all_bets": 10,
+        "get_all_events": 10,
+        "get_top_betters": 10,
+        "get_largest_bet": 5,
+        "create_bet": 10,
+    },
+    "mixed": {
+        "get_event": 15,
+        "get_event_statistics": 10,
+        "get_bets_for_event": 5,
+        "get_all_bets": 5,
+        "get_all_events": 5,
+        "get_top_betters": 5,
+        "get_largest_bet": 5,
+        "create_bet": 45,
+        "create_bets_batch": 5,
+    },
+    "write-heavy": {
+        "get_event": 5,
+        "get_event_statistics": 5,
+        "get_top_betters": 5,
+        "create_bet": 75,
+        "create_bets_batch": 10,
+    },
+}
+BATCH_SIZE = 100
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class LoadDriver:
+    def __init__(self, client: httpx.AsyncClient, event_ids: list[str], wallets: list[str], seed: int = 0):
+        self.client = client
+        self.event_ids = event_ids
+        self.wallets = wallets
+        self.rng = random.Random(seed)
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def random_bet(self) -> dict:
+        return {
+            "eventRequestId": self.rng.choice(self.event_ids),
+            "walletAddress": self.rng.choice(self.wallets),
+            "prediction": self.rng.choice(("YES", "NO")),
+            "tokens": round(self.rng.uniform(1, 500), 2),
+            "tokenName": "USDC",
+        }
+
+    def request(self, operation: str):
+        event_id = self.rng.choice(self.event_ids)
+        if operation == "get_event":
+            return self.client.get(f"/events/{event_id}")
+        if operation == "get_event_statistics":
+            return self.client.get(f"/events/{event_id}/stats")
+        if operation == "get_bets_for_event":
+            return self.client.get(f"/events/{event_id}/bets")
+        if operation == "get_all_bets":
+            return self.client.get("/bets", params={"limit": 100})
+        if operation == "get_all_events":
+            return self.client.get("/events", params={"limit": 100})
+        if operation == "get_top_betters":
+            return self.client.get("/top-betters", params={"limit": 10})
+        if operation == "get_largest_bet":
+            return self.client.get("/largest-bet")
+        if operation == "create_bet":
+            return self.client.post("/bets", json=self.random_bet())
+        if operation == "create_bets_batch":
+            return self.client.post(
+                "/bets/batch", json=[self.random_bet() for _ in range(BATCH_SIZE)]
+            )
+        raise ValueError(f"Unknown operation {operation}")
+
+    async def worker(self, operations: list[str], weights: list[int], deadline: float):
+        while time.perf_counter() < deadline:
+            operation = self.rng.choices(operations, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await self.request(operation)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            self.latencies[operation].append(time.perf_counter() - start)
+            if failed:
+                self.errors[operation] += 1
+
+    async def run(self, scenario: str, duration: float, concurrency: int) -> dict:
+        mix = SCENARIOS[scenario]
+        operations, weights = list(mix), list(mix.values())
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            self.worker(operations, weights, start + duration)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for operation, latencies in sorted(self.latencies.items()):
+            latencies.sort()
+            endpoints[operation] = {
+                "count": len(latencies),
+                "errors": self.errors[operation],
+                "throughput_rps": len(latencies) / elapsed,
+                "mean_ms": sum(latencies) / len(latencies) * 1000,
+                "p50_ms": percentile(latencies, 0.50) * 1000,
+                "p95_ms": percentile(latencies, 0.95) * 1000,
+                "p99_ms": percentile(latencies, 0.99) * 1000,
+            }
+        total = sum(len(latencies) for latencies in self.latencies.values())
+        return {
+            "elapsed_s": elapsed,
+            "throughput_rps": total / elapsed,
+            "errors": sum(self.errors.values()),
+            "endpoints": endpoints,
+        }
+
+
+async def discover(client: httpx.AsyncClient, max_events: int = 10000):
+    event_ids, cursor = [], None
+    while len(event_ids) < max_events:
+        params = {"limit": 1000}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/events", params=params)
+        response.raise_for_status()
+        event_ids.extend(event["requestId"] for event in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    top = await client.get("/top-betters", params={"limit": 1000})
+    top.raise_for_status()
+    wallets = [better["wallet_address"] for better in top.json()]
+    if not event_ids:
+        raise RuntimeError("No events found; run `python -m bench generate` first")
+    return event_ids, wallets or ["0x" + "0" * 40]
+
+
+async def run_load(client: httpx.AsyncClient, scenario: str, duration: float, concurrency: int, seed: int = 0):
+    event_ids, wallets = await discover(client)
+    driver = LoadDriver(client, event_ids, wallets, seed=seed)
+    return await driver.run(scenario, duration, concurrency)
@@ -0,0 +1,56 @@
+import timeit
+from types import SimpleNamespace
+
+from models.bet import BetCreate, BetResponse, BetWithEventTitle
+from models.event import EventCreate, EventResponse
+from serialization import BET_COLUMNS, camel_keys, dump_rows, json_response
+
+BET_PAYLOAD = {
+    "eventRequestId": "bench-00000001",
+    "walletAddress": "0x" + "ab" * 20,
+    "prediction": "YES",
+    "tokens": 125.5,
+    "tokenName": "USDC",
+}
+EVENT_PAYLOAD = {
+    "requestId": "bench-00000001",
+    "title": "Benchmark event",
+    "description": "Will ETH close above 3000?",
+    "dueDate": 1725000000,
+    "predict": {"price": "3000", "symbol": "ETH"},
+}
+BET_ROW = ("bench-00000001", "0x" + "ab" * 20, "YES", 125.5, "USDC", 1)
+PAGE_SIZE = 100
+
+
+def cases():
+    bet = BetCreate.model_validate(BET_PAYLOAD)
+    bet_orm = SimpleNamespace(id=1, **bet.model_dump())
+    event_orm = SimpleNamespace(
+        **EventCreate.model_validate(EVENT_PAYLOAD).model_dump(), contracts={"market": "0x1"}
+    )
+    bet_with_title = SimpleNamespace(event_title="Benchmark event", **vars(bet_orm))
+    page = [bet_orm] * PAGE_SIZE
+    rows = [BET_ROW] * PAGE_SIZE
+    bet_keys = camel_keys(BET_COLUMNS)
+
+    return {
+        "bet_create_validate": lambda: BetCreate.model_validate(BET_PAYLOAD),
+        "event_create_validate": lambda: EventCreate.model_validate(EVENT_PAYLOAD),
+        "bet_response_from_orm": lambda: BetResponse.model_validate(bet_orm),
+        "event_response_from_orm": lambda: EventResponse.model_validate(event_orm),
+        "bet_with_event_title_from_orm": lambda: BetWithEventTitle.model_validate(bet_with_title),
+        "bet_response_dump_json": lambda: BetResponse.model_validate(bet_orm).model_dump_json(by_alias=True),
+        "bet_page_pydantic": lambda: [
+            BetResponse.model_validate(item).model_dump(by_alias=True) for item in page
+        ],
+        "bet_page_rows_orjson": lambda: json_response(dump_rows(rows, bet_keys)),
+    }
+
+
+def run_schemas(repeat: int = 5, number: int = 2000) -> dict:
+    results = {}
+    for name, case in cases().items():
+        timings = timeit.repeat(case, repeat=repeat, number=number)
+        results[name] = {"ns_per_op": min(timings) / number * 1e9}
+    return results
@@ -0,0 +1,219 @@
+import asyncio
+import os
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Float,
+    Enum,
+    Index,
+    LargeBinary,
+    select,
+    ForeignKey,
+    JSON,
+    BigInteger,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError, TimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from metrics import Histogram
+
+load_dotenv()
+
+
+def async_database_url(url: str) -> str:
+    url = make_url(url)
+    if url.drivername in ("postgres", "postgresql", "postgresql+psycopg2"):
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_time = Histogram()
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait_time.observe(time.perf_counter() - start)
+
+    def stats(self):
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "timeouts": self.timeouts,
+            "wait_seconds": self.wait_time.snapshot(),
+        }
+
+
+def engine_options() -> dict:
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", -1)),
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "0") == "1",
+    }
+
+
+DATABASE_URL = async_database_url(os.environ.get("DATABASE_URL"))
+
+engine = create_async_engine(DATABASE_URL, **engine_options())
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine, autoflush=False, expire_on_commit=False
+)
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def is_foreign_key_violation(error: IntegrityError) -> bool:
+    return (
+        getattr(error.orig, "sqlstate", None) == "23503"
+        or getattr(error.orig, "sqlite_errorname", None) == "SQLITE_CONSTRAINT_FOREIGNKEY"
+    )
+
+
+Base = declarative_base()
+
+
+class Event(Base):
+    __tablename__ = "events"
+
+    request_id = Column(String, primary_key=True, index=True)
+    title = Column(String)
+    description = Column(String)
+    due_date = Column(BigInteger)
+    predict = Column(JSON, nullable=True)
+    contracts = Column(JSON, nullable=True)
+    outcome = Column(Enum("YES", "NO", name="prediction_type"), nullable=True)
+    bets = relationship("Bet", back_populates="event")
+
+
+class Bet(Base):
+    __tablename__ = "bets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_request_id = Column(String, ForeignKey("events.request_id"))
+    wallet_address = Column(String, index=True)
+    prediction = Column(Enum("YES", "NO", name="prediction_type"))
+    tokens = Column(Float)
+    event = relationship("Event", back_populates="bets")
+    token_name = Column(String)
+
+    __table_args__ = (
+        Index("ix_bets_event_request_id_id", "event_request_id", "id"),
+        Index(
+            "ix_bets_event_request_id_prediction_tokens",
+            "event_request_id",
+            "prediction",
+            "tokens",
+        ),
+    )
+
+
+Index("ix_bets_tokens_desc", Bet.tokens.desc())
+Index("ix_bets_wallet_address_id", Bet.wallet_address, Bet.id)
+
+
+class EventStats(Base):
+    __tablename__ = "event_stats"
+
+    event_request_id = Column(
+        String, ForeignKey("events.request_id"), primary_key=True
+    )
+    total_bets = Column(Integer, nullable=False, default=0)
+    total_tokens = Column(Float, nullable=False, default=0)
+    yes_bets = Column(Integer, nullable=False, default=0)
+    no_bets = Column(Integer, nullable=False, default=0)
+
+
+class WalletStats(Base):
+    __tablename__ = "wallet_stats"
+
+    wallet_address = Column(String, primary_key=True)
+    event_request_id = Column(
+        String, ForeignKey("events.request_id"), primary_key=True
+    )
+    token_name = Column(String, primary_key=True)
+    total_bets = Column(Integer, nullable=False, default=0)
+    total_tokens = Column(Float, nullable=False, default=0)
+    yes_tokens = Column(Float, nullable=False, default=0)
+    no_tokens = Column(Float, nullable=False, default=0)
+
+
+class Payout(Base):
+    __tablename__ = "payouts"
+
+    id = Column(Integer, primary_key=True)
+    event_request_id = Column(String, ForeignKey("events.request_id"), nullable=False)
+    wallet_address = Column(String, nullable=False)
+    token_name = Column(String, nullable=False)
+    amount = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_payouts_event_request_id_wallet_address", "event_request_id", "wallet_address"),
+    )
+
+
+class MerkleTree(Base):
+    __tablename__ = "merkle_trees"
+
+    event_request_id = Column(
+        String, ForeignKey("events.request_id"), primary_key=True
+    )
+    token_name = Column(String, primary_key=True)
+    root = Column(String, nullable=False)
+    leaf_count = Column(Integer, nullable=False)
+    nodes = Column(LargeBinary, nullable=False)
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+
+async def upgrade_schema():
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(os.path.dirname(MIGRATIONS_DIR), "alembic.ini"))
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    await asyncio.to_thread(command.upgrade, config, "head")
+
+
+async def lock_events(db, request_ids) -> dict:
+    # FOR SHARE conflicts with the row lock taken by resolve_event's UPDATE, so
+    # a bet commits either before a resolution starts or sees its outcome.
+    rows = await db.execute(
+        select(Event.request_id, Event.outcome)
+        .where(Event.request_id.in_(request_ids))
+        .order_by(Event.request_id)
+        .with_for_update(read=True)
+    )
+    return dict(rows.all())
+
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,102 @@
+import hashlib
+
+import orjson
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from cache import MISSING, TTLCache
+from serialization import json_response
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+PENDING = "pending"
+
+
+def fingerprint(payload: BaseModel) -> str:
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+class MemoryIdempotencyBackend:
+    def __init__(self, ttl: float, maxsize: int = 100000):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def reserve(self, key: str, entry: dict, ttl: float):
+        existing = self._entries.get(key)
+        if existing is not MISSING:
+            return existing
+        self._entries.set(key, entry, ttl=ttl)
+        return None
+
+    async def store(self, key: str, entry: dict):
+        self._entries.set(key, entry)
+
+    async def delete(self, key: str):
+        self._entries.invalidate(key)
+
+
+class RedisIdempotencyBackend:
+    def __init__(self, url: str, ttl: float, prefix: str = "idempotency:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._ttl = int(ttl)
+        self._prefix = prefix
+
+    async def reserve(self, key: str, entry: dict, ttl: float):
+        key = self._prefix + key
+        if await self._redis.set(key, orjson.dumps(entry), nx=True, ex=int(ttl)):
+            return None
+        existing = await self._redis.get(key)
+        return orjson.loads(existing) if existing is not None else None
+
+    async def store(self, key: str, entry: dict):
+        await self._redis.set(self._prefix + key, orjson.dumps(entry), ex=self._ttl)
+
+    async def delete(self, key: str):
+        await self._redis.delete(self._prefix + key)
+
+
+class IdempotencyStore:
+    def __init__(self, backend, pending_ttl: float = 60):
+        self.backend = backend
+        self.pending_ttl = pending_ttl
+
+    async def begin(self, scope: str, key: str | None, payload: BaseModel):
+        if key is None:
+            return None
+        entry = {"state": PENDING, "fingerprint": fingerprint(payload)}
+        existing = await self.backend.reserve(f"{scope}:{key}", entry, self.pending_ttl)
+        if existing is None:
+            return None
+        if existing["fingerprint"] != entry["fingerprint"]:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency key was already used with a different payload",
+            )
+        if existing["state"] == PENDING:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this idempotency key is still in progress",
+            )
+        return json_response(
+            existing["body"],
+            status_code=existing["status_code"],
+            headers={IDEMPOTENT_REPLAYED_HEADER: "true"},
+        )
+
+    async def complete(self, scope: str, key: str | None, payload: BaseModel, response: BaseModel):
+        if key is None:
+            return
+        await self.backend.store(
+            f"{scope}:{key}",
+            {
+                "state": "done",
+                "fingerprint": fingerprint(payload),
+                "status_code": 200,
+                "body": response.model_dump(mode="json", by_alias=True),
+            },
+        )
+
+    async def abort(self, scope: str, key: str | None):
+        if key is not None:
+            await self.backend.delete(f"{scope}:{key}")
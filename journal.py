@@ -0,0 +1,283 @@
+import asyncio
+import fcntl
+import logging
+import os
+from collections import deque
+from itertools import count
+from pathlib import Path
+
+import orjson
+from sqlalchemy import select, text
+
+from database import Bet, AsyncSessionLocal, engine, lock_events
+from stats import record_bets, upsert_insert
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".journal"
+LOCK_FILE = ".lock"
+REJECTED_FILE = "rejected.jsonl"
+JOURNAL_COLUMNS = (
+    Bet.id,
+    Bet.event_request_id,
+    Bet.wallet_address,
+    Bet.prediction,
+    Bet.tokens,
+    Bet.token_name,
+)
+
+
+# Bet ids are reserved in per-process blocks and rows reach the table about
+# one flush interval after they are acknowledged, so ids do not appear in
+# order. An id keyset cursor (`WHERE id > :cursor`) taken while the journal is
+# on can therefore skip bets that land later below the cursor.
+class BetJournal:
+    def __init__(
+        self,
+        directory: str,
+        flush_interval: float = 1.0,
+        flush_batch_size: int = 5000,
+        id_block_size: int = 1000,
+        on_flush=None,
+    ):
+        self.root = Path(directory)
+        self.directory = None
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.id_block_size = id_block_size
+        self.on_flush = on_flush
+        self._ids = deque()
+        self._id_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._queue = asyncio.Queue()
+        self._segment = 0
+        self._file = None
+        self._lock_file = None
+        self._appended = 0
+        self._tasks = []
+
+    async def start(self):
+        if engine.dialect.name != "postgresql":
+            raise RuntimeError("The bet journal requires a PostgreSQL database")
+        self._claim_directory()
+        await self._drain_orphaned_slots()
+        segments = self._segments()
+        self._segment = int(segments[-1].stem) + 1 if segments else 1
+        self._file = open(self._segment_path(self._segment), "ab")
+        self._tasks = [
+            asyncio.create_task(self._write_loop()),
+            asyncio.create_task(self._flush_loop()),
+        ]
+        await self.flush()
+
+    async def stop(self):
+        try:
+            await self.flush()
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            self._file.close()
+            self._lock_file.close()
+
+    def _claim_directory(self):
+        # Every process journals into its own slot, so workers sharing
+        # BET_JOURNAL_DIR never write or drain each other's segments. A slot
+        # left by a dead process is picked up, and drained, by the next one.
+        self.root.mkdir(parents=True, exist_ok=True)
+        for slot in count():
+            directory = self.root / f"slot-{slot}"
+            directory.mkdir(exist_ok=True)
+            lock_file = open(directory / LOCK_FILE, "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                continue
+            self.directory = directory
+            self._lock_file = lock_file
+            return
+
+    async def _drain_orphaned_slots(self):
+        # Slots nobody claims, for example after running fewer workers, would
+        # otherwise keep their acknowledged bets forever.
+        for directory in sorted(self.root.glob("slot-*")):
+            if directory == self.directory:
+                continue
+            with open(directory / LOCK_FILE, "a") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                for path in sorted(directory.glob(f"*{SEGMENT_SUFFIX}")):
+                    await self._drain(path)
+                    path.unlink()
+
+    async def append(self, bet: dict) -> int:
+        bet_id = await self._next_id()
+        waiter = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((orjson.dumps({**bet, "id": bet_id}) + b"\n", waiter))
+        await waiter
+        return bet_id
+
+    async def flush(self):
+        async with self._flush_lock:
+            if self._appended:
+                waiter = asyncio.get_running_loop().create_future()
+                self._queue.put_nowait((None, waiter))
+                await waiter
+            for path in self._segments()[:-1]:
+                await self._drain(path)
+                path.unlink()
+
+    async def _next_id(self) -> int:
+        while not self._ids:
+            async with self._id_lock:
+                if not self._ids:
+                    self._ids.extend(await self._reserve_ids(self.id_block_size))
+        return self._ids.popleft()
+
+    async def _reserve_ids(self, count: int):
+        async with AsyncSessionLocal() as db:
+            ids = await db.scalars(
+                text(
+                    "SELECT nextval(pg_get_serial_sequence('bets', 'id')) "
+                    "FROM generate_series(1, :count)"
+                ),
+                {"count": count},
+            )
+            return ids.all()
+
+    async def _write_loop(self):
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            waiters = []
+            for line, waiter in batch:
+                if line is None:
+                    error = await self._sync(waiters)
+                    if error is None:
+                        self._rotate(waiter)
+                    else:
+                        self._fail([waiter], error)
+                    waiters = []
+                    continue
+                try:
+                    self._file.write(line)
+                except Exception as e:
+                    self._fail(waiters + [waiter], e)
+                    waiters = []
+                    self._rotate()
+                    continue
+                self._appended += 1
+                waiters.append(waiter)
+            await self._sync(waiters)
+
+    async def _sync(self, waiters) -> Exception | None:
+        if not waiters:
+            return None
+        try:
+            self._file.flush()
+            await asyncio.to_thread(os.fsync, self._file.fileno())
+        except Exception as e:
+            self._fail(waiters, e)
+            # A partly written line would corrupt the next one, so continue in
+            # a fresh segment.
+            self._rotate()
+            return e
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        return None
+
+    def _fail(self, waiters, error: Exception):
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_exception(error)
+
+    def _rotate(self, waiter=None):
+        try:
+            self._file.close()
+        except OSError:
+            logger.exception("Closing bet journal segment %s failed", self._segment)
+        self._segment += 1
+        try:
+            self._file = open(self._segment_path(self._segment), "ab")
+        except Exception as e:
+            logger.exception("Opening bet journal segment %s failed", self._segment)
+            if waiter is not None:
+                self._fail([waiter], e)
+            return
+        self._appended = 0
+        if waiter is not None:
+            waiter.set_result(None)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flushing the bet journal failed")
+
+    async def _drain(self, path: Path):
+        bets = []
+        with open(path, "rb") as segment:
+            for line in segment:
+                try:
+                    bets.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    logger.warning("Skipping a torn journal entry in %s", path)
+
+        for start in range(0, len(bets), self.flush_batch_size):
+            batch = bets[start:start + self.flush_batch_size]
+            async with AsyncSessionLocal() as db:
+                outcomes = await lock_events(db, {bet["event_request_id"] for bet in batch})
+                accepted = []
+                closed = []
+                for bet in batch:
+                    if outcomes.get(bet["event_request_id"], "missing") is None:
+                        accepted.append(bet)
+                    else:
+                        closed.append(bet)
+                rows = []
+                if accepted:
+                    stmt = upsert_insert(db, Bet).on_conflict_do_nothing(
+                        index_elements=[Bet.id]
+                    )
+                    inserted = await db.execute(stmt.returning(*JOURNAL_COLUMNS), accepted)
+                    rows = [dict(row._mapping) for row in inserted]
+                if closed:
+                    # A replayed segment may hold bets inserted before the event
+                    # was resolved; only the ones that never made it are rejected.
+                    stored = set(await db.scalars(
+                        select(Bet.id).where(Bet.id.in_([bet["id"] for bet in closed]))
+                    ))
+                    self._reject([bet for bet in closed if bet["id"] not in stored])
+                stats = await record_bets(db, rows)
+                await db.commit()
+            if self.on_flush is not None:
+                await self.on_flush(rows, stats)
+
+    def _reject(self, bets):
+        if not bets:
+            return
+        # These bets were acknowledged but their event was resolved (or is
+        # gone) before they reached the table, so they need a manual refund.
+        with open(self.root / REJECTED_FILE, "ab") as rejected:
+            for bet in bets:
+                rejected.write(orjson.dumps(bet) + b"\n")
+            rejected.flush()
+            os.fsync(rejected.fileno())
+        logger.error(
+            "Rejected %d journaled bets on closed events, see %s",
+            len(bets),
+            self.root / REJECTED_FILE,
+        )
+
+    def _segments(self):
+        return sorted(self.directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"{segment:012d}{SEGMENT_SUFFIX}"
@@ -0,0 +1,26 @@
+from sqlalchemy import select
+
+from database import Event, AsyncSessionLocal
+
+
+class KnownEventFilter:
+    def __init__(self):
+        self._ids = set()
+
+    def add(self, request_id: str):
+        self._ids.add(request_id)
+
+    def discard(self, request_id: str):
+        self._ids.discard(request_id)
+
+    def __contains__(self, request_id: str) -> bool:
+        return request_id in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    async def load(self):
+        async with AsyncSessionLocal() as db:
+            self._ids = set(
+                await db.scalars(select(Event.request_id).where(Event.outcome.is_(None)))
+            )
@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from bisect import bisect_left, insort
+
+from sqlalchemy import select, func
+
+from database import WalletStats, AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class Leaderboard:
+    def __init__(self):
+        self._totals = {}
+        self._ranking = []
+        self._loading = None
+
+    def add(self, wallet_address: str, tokens: float):
+        if self._loading is not None:
+            self._loading.append((wallet_address, tokens))
+        total = self._totals.get(wallet_address)
+        if total is not None:
+            del self._ranking[bisect_left(self._ranking, (-total, wallet_address))]
+            tokens += total
+        self._totals[wallet_address] = tokens
+        insort(self._ranking, (-tokens, wallet_address))
+
+    def replace(self, totals: dict, pending=()):
+        self._totals = dict(totals)
+        self._ranking = sorted((-total, wallet) for wallet, total in totals.items())
+        for bet in pending:
+            self.add(*bet)
+
+    def top(self, limit: int):
+        return [
+            {"wallet_address": wallet, "total_tokens": -total}
+            for total, wallet in self._ranking[:max(limit, 0)]
+        ]
+
+    async def load(self):
+        # Bets added while the query runs may be missing from its result, so
+        # they are replayed on top of it.
+        self._loading = []
+        try:
+            async with AsyncSessionLocal() as db:
+                rows = await db.execute(
+                    select(
+                        WalletStats.wallet_address, func.sum(WalletStats.total_tokens)
+                    ).group_by(WalletStats.wallet_address)
+                )
+            totals = {wallet: total for wallet, total in rows}
+            pending, self._loading = self._loading, None
+            self.replace(totals, pending)
+        finally:
+            self._loading = None
+
+    async def reconcile_forever(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Leaderboard reconciliation failed")
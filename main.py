@@ -1,86 +1,354 @@
+import asyncio
 import os
+from collections import defaultdict
+from contextlib import asynccontextmanager
 
-from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Body, Depends, Header, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
-
-from sqlalchemy import (
-    create_engine,
-    Column,
-    Integer,
-    String,
-    Float,
-    Enum,
-    ForeignKey,
-    JSON,
-    BigInteger,
-    func,
-    case,
-)
-from sqlalchemy.orm import declarative_base, sessionmaker, Session, relationship
+from typing import Any, List
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import select, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
-from models.bet import BetCreate, BetResponse, BetWithEventTitle
-from models.event import EventCreate, EventResponse, ContractsUpdate
+from cache import MISSING, TTLCache
+from database import (
+    Event,
+    Bet,
+    EventStats,
+    WalletStats,
+    engine,
+    get_db,
+    is_foreign_key_violation,
+    lock_events,
+)
+from idempotency import (
+    IDEMPOTENCY_KEY_HEADER,
+    IDEMPOTENT_REPLAYED_HEADER,
+    IdempotencyStore,
+    MemoryIdempotencyBackend,
+    RedisIdempotencyBackend,
+)
+from journal import BetJournal
+from known_events import KnownEventFilter
+from leaderboard import Leaderboard
+from metrics import (
+    PrometheusMiddleware,
+    family_samples,
+    instrument_engine,
+    metrics_response,
+    registry,
+)
+from models.bet import (
+    BetCreate,
+    BetResponse,
+    BetWithEventTitle,
+    BetBatchItemResult,
+    BetBatchResponse,
+)
+from models.event import (
+    EventCreate,
+    EventResponse,
+    ContractsUpdate,
+    EventResolve,
+    EventResolution,
+    EventOdds,
+    EventLookup,
+    EventLookupResponse,
+    WalletProofs,
+)
+from models.wallet import WalletSummary
+from odds import OddsBook
+from payouts import payout_proofs, resolve_payouts, shutdown_tree_pool
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, set_next_cursor
+from serialization import (
+    BET_COLUMNS,
+    BET_WITH_EVENT_TITLE_COLUMNS,
+    EVENT_COLUMNS,
+    camel_dict,
+    camel_keys,
+    dump_rows,
+    json_response,
+    ndjson_lines,
+)
+from profiling import QueryProfiler, QueryProfilingMiddleware
+from pubsub import BetHub, LocalBackend, RedisBackend
+from replicas import (
+    LAST_WRITE_HEADER,
+    ReadYourWritesMiddleware,
+    get_read_db,
+    read_sessionmaker,
+    reads_from_primary,
+    replicas,
+)
+from stats import record_bets
+
+
+MAX_BET_BATCH_SIZE = 10000
+STREAM_BATCH_SIZE = 1000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_KEEPALIVE_INTERVAL = 15
+EVENT_KEYS = camel_keys(EVENT_COLUMNS)
+BET_KEYS = camel_keys(BET_COLUMNS)
+BET_WITH_EVENT_TITLE_KEYS = camel_keys(BET_WITH_EVENT_TITLE_COLUMNS)
+LEADERBOARD_RECONCILE_INTERVAL = float(
+    os.environ.get("LEADERBOARD_RECONCILE_INTERVAL", 30)
+)
+# A shared bet feed keeps every worker's odds live, so reconciling is only a
+# safety net; without one, other workers' bets show up at the next reconcile.
+ODDS_RECONCILE_INTERVAL = float(
+    os.environ.get(
+        "ODDS_RECONCILE_INTERVAL", 300 if os.environ.get("BET_FEED_REDIS_URL") else 30
+    )
+)
+REPLICA_HEALTH_CHECK_INTERVAL = float(
+    os.environ.get("REPLICA_HEALTH_CHECK_INTERVAL", 5)
+)
+
+stats_cache = TTLCache(
+    maxsize=int(os.environ.get("STATS_CACHE_SIZE", 10000)),
+    ttl=float(os.environ.get("STATS_CACHE_TTL", 5)),
+)
+
+event_cache = TTLCache(
+    maxsize=int(os.environ.get("EVENT_CACHE_SIZE", 10000)),
+    ttl=float(os.environ.get("EVENT_CACHE_TTL", 300)),
+)
+EVENT_CACHE_NEGATIVE_TTL = float(os.environ.get("EVENT_CACHE_NEGATIVE_TTL", 5))
+
+merkle_tree_cache = TTLCache(
+    maxsize=int(os.environ.get("MERKLE_TREE_CACHE_SIZE", 8)),
+    ttl=float(os.environ.get("MERKLE_TREE_CACHE_TTL", 600)),
+)
+
+known_events = (
+    KnownEventFilter() if os.environ.get("KNOWN_EVENT_FILTER") == "1" else None
+)
+
+leaderboard = Leaderboard()
+odds_book = OddsBook()
+
+
+BET_FEED_REDIS_URL = os.environ.get("BET_FEED_REDIS_URL")
+bet_hub = BetHub(
+    RedisBackend(BET_FEED_REDIS_URL) if BET_FEED_REDIS_URL else LocalBackend(),
+    max_pending=int(os.environ.get("BET_FEED_MAX_PENDING", 1000)),
+)
+
+
+def update_odds_from_feed(event_request_id: str, message: dict):
+    for bet in message.get("bets", ()):
+        odds_book.add(event_request_id, bet["tokenName"], bet["prediction"], bet["tokens"])
+
+
+# With a shared backend every worker's bets, this one's included, come back
+# through the feed, so the book is updated there instead of in bets_committed.
+if bet_hub.shared:
+    bet_hub.add_listener(update_odds_from_feed)
+
+
+async def bets_committed(bets: list[dict], stats: dict):
+    bets_by_event = defaultdict(list)
+    for bet in bets:
+        bets_by_event[bet["event_request_id"]].append(bet)
+        leaderboard.add(bet["wallet_address"], bet["tokens"])
+        if not bet_hub.shared:
+            odds_book.add(
+                bet["event_request_id"], bet["token_name"], bet["prediction"], bet["tokens"]
+            )
+    for event_request_id, event_bets in bets_by_event.items():
+        stats_cache.invalidate(event_request_id)
+        if not bet_hub.wants(event_request_id):
+            continue
+        event_stats = stats.get(event_request_id)
+        await bet_hub.publish(
+            event_request_id,
+            {
+                "bets": [
+                    BetResponse.model_validate(bet).model_dump(by_alias=True)
+                    for bet in event_bets
+                ],
+                "stats": camel_dict(event_stats) if event_stats is not None else None,
+            },
+        )
+
+
+IDEMPOTENCY_TTL = float(os.environ.get("IDEMPOTENCY_TTL", 86400))
+IDEMPOTENCY_REDIS_URL = os.environ.get("IDEMPOTENCY_REDIS_URL")
+idempotency = IdempotencyStore(
+    RedisIdempotencyBackend(IDEMPOTENCY_REDIS_URL, ttl=IDEMPOTENCY_TTL)
+    if IDEMPOTENCY_REDIS_URL
+    else MemoryIdempotencyBackend(ttl=IDEMPOTENCY_TTL)
+)
+
+# With the journal on, /bets and /wallets/{address}/bets cursors can skip
+# late-landing bets; see BetJournal.
+BET_JOURNAL_DIR = os.environ.get("BET_JOURNAL_DIR")
+bet_journal = None
+if BET_JOURNAL_DIR:
+    bet_journal = BetJournal(
+        BET_JOURNAL_DIR,
+        flush_interval=float(os.environ.get("BET_JOURNAL_FLUSH_INTERVAL", 1)),
+        flush_batch_size=int(os.environ.get("BET_JOURNAL_FLUSH_BATCH_SIZE", 5000)),
+        id_block_size=int(os.environ.get("BET_JOURNAL_ID_BLOCK_SIZE", 1000)),
+        on_flush=bets_committed,
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await leaderboard.load()
+    await odds_book.load()
+    if known_events is not None:
+        await known_events.load()
+    reconcile = asyncio.create_task(
+        leaderboard.reconcile_forever(LEADERBOARD_RECONCILE_INTERVAL)
+    )
+    reconcile_odds = asyncio.create_task(
+        odds_book.reconcile_forever(ODDS_RECONCILE_INTERVAL)
+    )
+    if replicas is not None:
+        await replicas.check_health()
+        replica_health = asyncio.create_task(
+            replicas.check_health_forever(REPLICA_HEALTH_CHECK_INTERVAL)
+        )
+    await bet_hub.start()
+    if bet_journal is not None:
+        await bet_journal.start()
+    yield
+    if bet_journal is not None:
+        await bet_journal.stop()
+    await bet_hub.stop()
+    reconcile.cancel()
+    reconcile_odds.cancel()
+    if replicas is not None:
+        replica_health.cancel()
+        await replicas.dispose()
+    shutdown_tree_pool()
+    await engine.dispose()
+
+
+async def load_event(db: AsyncSession, request_id: str) -> EventResponse | None:
+    event = event_cache.get(request_id)
+    if event is not MISSING:
+        return event
+
+    db_event = await db.get(Event, request_id)
+    event = EventResponse.model_validate(db_event) if db_event is not None else None
+    # A lagging replica may miss the event or return it from before a recent
+    # write, so only the primary fills the cache.
+    if reads_from_primary(db):
+        if event is None:
+            event_cache.set(request_id, None, ttl=EVENT_CACHE_NEGATIVE_TTL)
+        else:
+            event_cache.set(request_id, event)
+    return event
 
-load_dotenv()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        NEXT_CURSOR_HEADER,
+        IDEMPOTENT_REPLAYED_HEADER,
+        LAST_WRITE_HEADER,
+        "Server-Timing",
+    ],
 )
 
-DATABASE_URL = os.environ.get("DATABASE_URL")
-
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
-
-
-class Event(Base):
-    __tablename__ = "events"
-
-    request_id = Column(String, primary_key=True, index=True)
-    title = Column(String)
-    description = Column(String)
-    due_date = Column(BigInteger)
-    predict = Column(JSON, nullable=True)
-    contracts = Column(JSON, nullable=True)
-    bets = relationship("Bet", back_populates="event")
+if os.environ.get("QUERY_PROFILING") == "1":
+    query_profiler = QueryProfiler(
+        slow_query_threshold=float(os.environ.get("SLOW_QUERY_MS", 100)) / 1000,
+        n_plus_one_threshold=int(os.environ.get("N_PLUS_ONE_THRESHOLD", 5)),
+    )
+    query_profiler.instrument_engine(engine)
+    if replicas is not None:
+        for replica in replicas.engines:
+            query_profiler.instrument_engine(replica)
+    app.add_middleware(QueryProfilingMiddleware, profiler=query_profiler)
+if replicas is not None:
+    app.add_middleware(ReadYourWritesMiddleware, read_only_paths={"/events/lookup"})
+app.add_middleware(PrometheusMiddleware)
+
+instrument_engine(engine)
+if replicas is not None:
+    for replica in replicas.engines:
+        instrument_engine(replica)
+
+
+def collect_pool_metrics():
+    pools = {"primary": engine.pool}
+    if replicas is not None:
+        for index, replica in enumerate(replicas.engines):
+            pools[f"replica_{index}"] = replica.pool
+    for name, documentation, value in (
+        ("db_pool_size", "Configured pool size.", lambda pool: pool.size()),
+        ("db_pool_checked_out", "Connections checked out.", lambda pool: pool.checkedout()),
+        ("db_pool_overflow", "Overflow connections in use.", lambda pool: max(pool.overflow(), 0)),
+        ("db_pool_timeouts_total", "Pool checkout timeouts.", lambda pool: pool.timeouts),
+    ):
+        kind = "counter" if name.endswith("_total") else "gauge"
+        yield from family_samples(
+            kind,
+            name,
+            documentation,
+            (({"pool": pool_name}, value(pool)) for pool_name, pool in pools.items()),
+        )
+    yield from family_samples(
+        "histogram",
+        "db_pool_wait_seconds",
+        "Time spent waiting for a pool connection.",
+        (({"pool": pool_name}, pool.wait_time) for pool_name, pool in pools.items()),
+    )
 
 
-class Bet(Base):
-    __tablename__ = "bets"
+def collect_cache_metrics():
+    caches = {"events": event_cache, "stats": stats_cache}
+    for name, documentation, attribute in (
+        ("cache_hits_total", "Cache hits.", "hits"),
+        ("cache_misses_total", "Cache misses.", "misses"),
+    ):
+        yield from family_samples(
+            "counter",
+            name,
+            documentation,
+            (({"cache": cache_name}, getattr(cache, attribute)) for cache_name, cache in caches.items()),
+        )
 
-    id = Column(Integer, primary_key=True, index=True)
-    event_request_id = Column(String, ForeignKey("events.request_id"))
-    wallet_address = Column(String, index=True)
-    prediction = Column(Enum("YES", "NO", name="prediction_type"))
-    tokens = Column(Float)
-    event = relationship("Event", back_populates="bets")
-    token_name = Column(String)
 
+registry.register_collector(collect_pool_metrics)
+registry.register_collector(collect_cache_metrics)
 
-Base.metadata.create_all(bind=engine)
 
+@app.post("/events", tags=["events"],  response_model=EventResponse)
+async def create_event(
+    event: EventCreate,
+    idempotency_key: str | None = Header(default=None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: AsyncSession = Depends(get_db),
+):
+    replay = await idempotency.begin("events", idempotency_key, event)
+    if replay is not None:
+        return replay
 
-def get_db():
-    db = SessionLocal()
     try:
-        yield db
-    finally:
-        db.close()
+        result = await save_event(db, event)
+    except BaseException:
+        await idempotency.abort("events", idempotency_key)
+        raise
+    await idempotency.complete("events", idempotency_key, event, result)
+    return result
 
 
-@app.post("/events", tags=["events"],  response_model=EventResponse)
-async def create_event(event: EventCreate, db: Session = Depends(get_db)):
-    db_event = Event(
+async def save_event(db: AsyncSession, event: EventCreate) -> EventResponse:
+    stmt = insert(Event).values(
         request_id=event.request_id,
         title=event.title,
         description=event.description,
@@ -88,95 +356,383 @@ async def create_event(event: EventCreate, db: Session = Depends(get_db)):
         predict=event.predict.model_dump() if event.predict else None,
     )
     try:
-        db.add(db_event)
-        db.commit()
-        db.refresh(db_event)
+        db_event = (await db.execute(stmt.returning(*EVENT_COLUMNS))).one()
+        await db.commit()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400, detail="An event with this request ID already exists"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"An error occurred while saving the event: {str(e)}",
         )
-    return db_event
+    event_cache.invalidate(event.request_id)
+    if known_events is not None:
+        known_events.add(event.request_id)
+    return EventResponse.model_validate(db_event._mapping)
 
 
 @app.put("/events/{request_id}", tags=["events"], response_model=EventResponse)
 async def update_event_contracts(
-    request_id: str, contracts: ContractsUpdate, db: Session = Depends(get_db)
+    request_id: str, contracts: ContractsUpdate, db: AsyncSession = Depends(get_db)
 ):
-    db_event = db.query(Event).filter(Event.request_id == request_id).first()
+    db_event = (await db.execute(
+        update(Event)
+        .where(Event.request_id == request_id)
+        .values(contracts=contracts.contracts)
+        .returning(*EVENT_COLUMNS)
+    )).first()
     if not db_event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    db_event.contracts = contracts.contracts
-    db.commit()
-    db.refresh(db_event)
-    return db_event
+    await db.commit()
+    event_cache.invalidate(request_id)
+    return EventResponse.model_validate(db_event._mapping)
+
+
+@app.post(
+    "/events/{request_id}/resolve", tags=["events"], response_model=EventResolution
+)
+async def resolve_event(
+    request_id: str, resolution: EventResolve, db: AsyncSession = Depends(get_db)
+):
+    # Bets this process has acknowledged must be in the table before the payouts
+    # read it; other processes' late bets are rejected by the journal drain.
+    if bet_journal is not None:
+        await bet_journal.flush()
+
+    # The row lock taken here waits for bets holding the event FOR SHARE, so
+    # every bet that got in is committed before the payouts read them.
+    resolved = await db.scalar(
+        update(Event)
+        .where(Event.request_id == request_id, Event.outcome.is_(None))
+        .values(outcome=resolution.outcome)
+        .returning(Event.request_id)
+    )
+    if resolved is None:
+        await db.rollback()
+        if await db.get(Event, request_id) is None:
+            raise HTTPException(status_code=404, detail="Event not found")
+        raise HTTPException(status_code=409, detail="Event is already resolved")
+
+    try:
+        summary = await resolve_payouts(db, request_id, resolution.outcome)
+        await db.commit()
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while resolving the event: {str(e)}",
+        )
+    event_cache.invalidate(request_id)
+    if known_events is not None:
+        known_events.discard(request_id)
+    return EventResolution(request_id=request_id, outcome=resolution.outcome, **summary)
+
+
+@app.get(
+    "/events/{request_id}/proof/{wallet_address}",
+    tags=["events"],
+    response_model=WalletProofs,
+)
+async def get_payout_proof(
+    request_id: str, wallet_address: str, db: AsyncSession = Depends(get_read_db)
+):
+    try:
+        proofs = await payout_proofs(
+            db, request_id, wallet_address.lower(), merkle_tree_cache
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not proofs:
+        raise HTTPException(status_code=404, detail="No payout found for this wallet")
+    return WalletProofs(
+        request_id=request_id, wallet_address=wallet_address.lower(), proofs=proofs
+    )
 
 
 @app.get("/events", tags=["events"], response_model=List[EventResponse])
 async def get_all_events(
-    skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    events = db.query(Event).offset(skip).limit(limit).all()
-    return events
+    query = select(*EVENT_COLUMNS).order_by(Event.request_id).limit(limit)
+    if cursor is not None:
+        query = query.where(Event.request_id > decode_cursor(cursor, str))
+    else:
+        query = query.offset(skip)
+
+    events = (await db.execute(query)).all()
+    response = json_response(dump_rows(events, EVENT_KEYS))
+    set_next_cursor(response, events, limit, lambda event: event.request_id)
+    return response
+
+
+@app.post("/events/lookup", tags=["events"], response_model=EventLookupResponse)
+async def lookup_events(lookup: EventLookup, db: AsyncSession = Depends(get_read_db)):
+    found = {}
+    misses = []
+    for request_id in dict.fromkeys(lookup.ids):
+        event = event_cache.get(request_id)
+        if event is MISSING:
+            misses.append(request_id)
+        elif event is not None:
+            found[request_id] = event
+
+    if misses:
+        rows = await db.execute(
+            select(*EVENT_COLUMNS).where(Event.request_id.in_(misses))
+        )
+        for row in rows:
+            event = EventResponse.model_validate(row._mapping)
+            found[event.request_id] = event
+        if reads_from_primary(db):
+            for request_id in misses:
+                if request_id in found:
+                    event_cache.set(request_id, found[request_id])
+                else:
+                    event_cache.set(request_id, None, ttl=EVENT_CACHE_NEGATIVE_TTL)
+
+    return EventLookupResponse(
+        events=[found[request_id] for request_id in lookup.ids if request_id in found],
+        missing=[request_id for request_id in lookup.ids if request_id not in found],
+    )
 
 
 @app.get("/events/{request_id}", tags=["events"], response_model=EventResponse)
-async def get_event(request_id: str, db: Session = Depends(get_db)):
-    event = db.query(Event).filter(Event.request_id == request_id).first()
+async def get_event(request_id: str, db: AsyncSession = Depends(get_read_db)):
+    event = await load_event(db, request_id)
     if event is None:
         raise HTTPException(status_code=404, detail="Event not found")
     return event
 
 
 @app.post("/bets", tags=["bets"], response_model=BetResponse)
-async def create_bet(bet: BetCreate, db: Session = Depends(get_db)):
-    event = db.query(Event).filter(Event.request_id == bet.event_request_id).first()
-    if not event:
+async def create_bet(
+    bet: BetCreate,
+    idempotency_key: str | None = Header(default=None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: AsyncSession = Depends(get_db),
+):
+    replay = await idempotency.begin("bets", idempotency_key, bet)
+    if replay is not None:
+        return replay
+
+    try:
+        result = await save_bet(db, bet)
+    except BaseException:
+        await idempotency.abort("bets", idempotency_key)
+        raise
+    await idempotency.complete("bets", idempotency_key, bet, result)
+    return result
+
+
+async def save_bet(db: AsyncSession, bet: BetCreate) -> BetResponse:
+    if bet_journal is not None:
+        # Only an early rejection: the journal drain re-checks every bet
+        # against the locked event row before inserting it.
+        if known_events is None or bet.event_request_id not in known_events:
+            event = await load_event(db, bet.event_request_id)
+            if event is None:
+                raise HTTPException(status_code=404, detail="Event not found")
+            if event.outcome is not None:
+                raise HTTPException(status_code=409, detail="Event is already resolved")
+            if known_events is not None:
+                known_events.add(bet.event_request_id)
+        try:
+            bet_id = await bet_journal.append(bet.model_dump())
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"An error occurred while saving the bet: {str(e)}",
+            )
+        return BetResponse(id=bet_id, **bet.model_dump())
+
+    events = await lock_events(db, [bet.event_request_id])
+    if bet.event_request_id not in events:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Event not found")
+    if events[bet.event_request_id] is not None:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Event is already resolved")
 
-    db_bet = Bet(**bet.dict())
     try:
-        db.add(db_bet)
-        db.commit()
-        db.refresh(db_bet)
+        bet_id = await db.scalar(
+            insert(Bet).values(**bet.model_dump()).returning(Bet.id)
+        )
+        stats = await record_bets(db, [bet.model_dump()])
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if is_foreign_key_violation(e):
+            raise HTTPException(status_code=404, detail="Event not found")
+        raise HTTPException(
+            status_code=500, detail=f"An error occurred while saving the bet: {str(e)}"
+        )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500, detail=f"An error occurred while saving the bet: {str(e)}"
         )
+    await bets_committed([{**bet.model_dump(), "id": bet_id}], stats)
+
+    return BetResponse(id=bet_id, **bet.model_dump())
+
+
+# Items are validated one by one, so the body schema is only declared for the docs.
+@app.post(
+    "/bets/batch",
+    tags=["bets"],
+    response_model=BetBatchResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": BetCreate.model_json_schema()}
+                }
+            }
+        }
+    },
+)
+async def create_bets_batch(
+    items: List[Any] = Body(), db: AsyncSession = Depends(get_db)
+):
+    if len(items) > MAX_BET_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch may contain at most {MAX_BET_BATCH_SIZE} bets",
+        )
 
-    return db_bet
+    results = [BetBatchItemResult(index=index) for index in range(len(items))]
+    bets = {}
+    for index, item in enumerate(items):
+        try:
+            bets[index] = BetCreate.model_validate(item)
+        except ValidationError as e:
+            results[index].error = "; ".join(
+                f"{'.'.join(map(str, error['loc'])) or 'bet'}: {error['msg']}"
+                for error in e.errors(include_url=False)
+            )
+
+    event_ids = {bet.event_request_id for bet in bets.values()}
+    outcomes = {}
+    if event_ids:
+        outcomes = await lock_events(db, event_ids)
+
+    accepted = []
+    for index, bet in bets.items():
+        if bet.event_request_id not in outcomes:
+            results[index].error = "Event not found"
+        elif outcomes[bet.event_request_id] is not None:
+            results[index].error = "Event is already resolved"
+        else:
+            accepted.append(index)
+
+    if accepted:
+        rows = [bets[index].model_dump() for index in accepted]
+        try:
+            ids = await db.scalars(
+                insert(Bet).returning(Bet.id, sort_by_parameter_order=True), rows
+            )
+            for index, row, bet_id in zip(accepted, rows, ids.all()):
+                results[index].id = row["id"] = bet_id
+            stats = await record_bets(db, rows)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail=f"An error occurred while saving the bets: {str(e)}",
+            )
+        await bets_committed(rows, stats)
+
+    return BetBatchResponse(inserted=len(accepted), results=results)
 
 
 @app.get("/events/{request_id}/bets", tags=["bets"], response_model=List[BetResponse])
-async def get_bets_for_event(request_id: str, db: Session = Depends(get_db)):
-    event = db.query(Event).filter(Event.request_id == request_id).first()
+async def get_bets_for_event(request_id: str, request: Request, stream: bool = False):
+    sessionmaker = read_sessionmaker(request)
+    # The stream opens its own session, so this one is closed before it starts.
+    async with sessionmaker() as db:
+        event = await load_event(db, request_id)
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+
+        if stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+            return StreamingResponse(
+                stream_bets_for_event(request_id, sessionmaker),
+                media_type=NDJSON_MEDIA_TYPE,
+            )
+
+        bets = await db.execute(
+            select(*BET_COLUMNS).filter(Bet.event_request_id == request_id)
+        )
+        return json_response(dump_rows(bets, BET_KEYS))
+
+
+@app.get("/events/{request_id}/bets/stream", tags=["bets"])
+async def stream_new_bets(request_id: str, request: Request, stats: bool = False):
+    # A request-scoped session would hold its connection for the whole stream.
+    async with read_sessionmaker(request)() as db:
+        event = await load_event(db, request_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    bets = db.query(Bet).filter(Bet.event_request_id == request_id).all()
-    return bets
+    subscription = bet_hub.subscribe(request_id, include_stats=stats)
+    return StreamingResponse(
+        bet_feed(request, request_id, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-@app.get("/top-betters", tags=["stats"])
-async def get_top_betters(limit: int = 10, db: Session = Depends(get_db)):
-    top_betters = db.query(
-        Bet.wallet_address,
-        func.sum(Bet.tokens).label('total_tokens')
-    ).group_by(Bet.wallet_address).order_by(func.sum(Bet.tokens).desc()).limit(limit).all()
 
-    return [{"wallet_address": better[0], "total_tokens": better[1]} for better in top_betters]
+async def bet_feed(request: Request, request_id: str, subscription):
+    try:
+        while not await request.is_disconnected():
+            update = await subscription.next(timeout=SSE_KEEPALIVE_INTERVAL)
+            if update is None:
+                yield b": keepalive\n\n"
+                continue
+            bets, stats = update
+            yield b"".join(
+                b"event: bet\nid: %d\ndata: %s\n\n" % (bet["id"], orjson.dumps(bet))
+                for bet in bets
+            )
+            if stats is not None:
+                yield b"event: stats\ndata: %s\n\n" % orjson.dumps(stats)
+            if subscription.overflowed:
+                yield b"event: overflow\ndata: {}\n\n"
+                return
+    finally:
+        bet_hub.unsubscribe(request_id, subscription)
+
+
+async def stream_bets_for_event(request_id: str, sessionmaker):
+    async with sessionmaker() as db:
+        bets = await db.stream(
+            select(*BET_COLUMNS)
+            .filter(Bet.event_request_id == request_id)
+            .order_by(Bet.id)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for partition in bets.partitions():
+            yield ndjson_lines(partition, BET_KEYS)
+
+@app.get("/top-betters", tags=["stats"])
+async def get_top_betters(limit: int = 10):
+    return leaderboard.top(limit)
 
 
 @app.get("/largest-bet", tags=["stats"])
-async def get_largest_bet(db: Session = Depends(get_db)):
-    largest_bet = db.query(Bet).order_by(Bet.tokens.desc()).first()
+async def get_largest_bet(db: AsyncSession = Depends(get_read_db)):
+    largest_bet = await db.scalar(select(Bet).order_by(Bet.tokens.desc()).limit(1))
     if not largest_bet:
         raise HTTPException(status_code=404, detail="No bets found")
 
@@ -188,45 +744,138 @@ async def get_largest_bet(db: Session = Depends(get_db)):
     }
 
 
-@app.get("/events/{request_id}", tags=["stats"])
-async def get_event_statistics(request_id: str, db: Session = Depends(get_db)):
-    event = db.query(Event).filter(Event.request_id == request_id).first()
+@app.get("/events/{request_id}/stats", tags=["stats"])
+async def get_event_statistics(request_id: str, db: AsyncSession = Depends(get_read_db)):
+    cached = stats_cache.get(request_id)
+    if cached is not MISSING:
+        return cached
+
+    event = await load_event(db, request_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    stats = db.query(
-        func.count().label('total_bets'),
-        func.sum(Bet.tokens).label('total_tokens'),
-        func.sum(case((Bet.prediction == 'YES', 1), else_=0)).label('yes_bets'),
-        func.sum(case((Bet.prediction == 'NO', 1), else_=0)).label('no_bets')
-    ).filter(Bet.event_request_id == request_id).first()
+    stats = await db.get(EventStats, request_id)
 
-    return {
+    result = {
         "request_id": request_id,
         "title": event.title,
-        "total_bets": stats.total_bets or 0,
-        "total_tokens": float(stats.total_tokens or 0),
-        "yes_bets": stats.yes_bets or 0,
-        "no_bets": stats.no_bets or 0
+        "total_bets": stats.total_bets if stats else 0,
+        "total_tokens": float(stats.total_tokens) if stats else 0.0,
+        "yes_bets": stats.yes_bets if stats else 0,
+        "no_bets": stats.no_bets if stats else 0
     }
+    if reads_from_primary(db):
+        stats_cache.set(request_id, result)
+    return result
+
+
+@app.get("/events/{request_id}/odds", tags=["stats"], response_model=EventOdds)
+async def get_event_odds(request_id: str, db: AsyncSession = Depends(get_read_db)):
+    if request_id not in odds_book and not await load_event(db, request_id):
+        raise HTTPException(status_code=404, detail="Event not found")
+    return Response(content=odds_book.payload(request_id), media_type="application/json")
+
+
+@app.get("/internal/cache", tags=["internal"])
+async def get_cache_info():
+    return {"events": event_cache.info(), "stats": stats_cache.info()}
+
+
+@app.get("/metrics", tags=["internal"], include_in_schema=False)
+async def get_metrics():
+    return metrics_response()
+
+
+@app.get("/internal/pool", tags=["internal"])
+async def get_pool_info():
+    pools = {"primary": engine.pool.stats()}
+    if replicas is not None:
+        for index, replica in enumerate(replicas.engines):
+            pools[f"replica_{index}"] = {
+                **replica.pool.stats(),
+                "healthy": replicas.healthy[index],
+            }
+    return pools
 
 
 @app.get("/bets", response_model=List[BetWithEventTitle], tags=["bets"])
-async def get_all_bets(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    bets_with_events = db.query(Bet, Event.title).join(Event).order_by(Bet.id).offset(skip).limit(limit).all()
-
-    return [
-        BetWithEventTitle(
-            id=bet.id,
-            event_request_id=bet.event_request_id,
-            event_title=event_title,
-            wallet_address=bet.wallet_address,
-            prediction=bet.prediction,
-            tokens=bet.tokens,
-            token_name=bet.token_name
-        )
-        for bet, event_title in bets_with_events
-    ]
+async def get_all_bets(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    query = (
+        select(*BET_WITH_EVENT_TITLE_COLUMNS)
+        .join(Event)
+        .order_by(Bet.id)
+        .limit(limit)
+    )
+    if cursor is not None:
+        query = query.where(Bet.id > decode_cursor(cursor, int))
+    else:
+        query = query.offset(skip)
+
+    bets_with_events = (await db.execute(query)).all()
+    response = json_response(dump_rows(bets_with_events, BET_WITH_EVENT_TITLE_KEYS))
+    set_next_cursor(response, bets_with_events, limit, lambda row: row.id)
+    return response
+
+
+@app.get(
+    "/wallets/{wallet_address}/bets", response_model=List[BetResponse], tags=["wallets"]
+)
+async def get_wallet_bets(
+    wallet_address: str,
+    limit: int = 100,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    query = (
+        select(*BET_COLUMNS)
+        .where(Bet.wallet_address == wallet_address.lower())
+        .order_by(Bet.id)
+        .limit(limit)
+    )
+    if cursor is not None:
+        query = query.where(Bet.id > decode_cursor(cursor, int))
+
+    bets = (await db.execute(query)).all()
+    response = json_response(dump_rows(bets, BET_KEYS))
+    set_next_cursor(response, bets, limit, lambda bet: bet.id)
+    return response
+
+
+@app.get(
+    "/wallets/{wallet_address}/summary", response_model=WalletSummary, tags=["wallets"]
+)
+async def get_wallet_summary(
+    wallet_address: str, db: AsyncSession = Depends(get_read_db)
+):
+    wallet_address = wallet_address.lower()
+    rows = await db.execute(
+        select(WalletStats)
+        .where(WalletStats.wallet_address == wallet_address)
+        .order_by(WalletStats.event_request_id, WalletStats.token_name)
+    )
+    events = rows.scalars().all()
+
+    tokens = defaultdict(
+        lambda: {"total_bets": 0, "total_tokens": 0.0, "yes_tokens": 0.0, "no_tokens": 0.0}
+    )
+    for exposure in events:
+        token = tokens[exposure.token_name]
+        token["total_bets"] += exposure.total_bets
+        token["total_tokens"] += exposure.total_tokens
+        token["yes_tokens"] += exposure.yes_tokens
+        token["no_tokens"] += exposure.no_tokens
+
+    return WalletSummary(
+        wallet_address=wallet_address,
+        total_bets=sum(exposure.total_bets for exposure in events),
+        events=events,
+        tokens=tokens,
+    )
 
 
 if __name__ == "__main__":
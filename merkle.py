@@ -0,0 +1,74 @@
+import re
+from bisect import bisect_left
+
+from Crypto.Hash import keccak
+
+HASH_SIZE = 32
+ADDRESS_PATTERN = re.compile(r"0x[0-9a-fA-F]{40}")
+
+
+def keccak256(data: bytes) -> bytes:
+    return keccak.new(digest_bits=256, data=data).digest()
+
+
+def is_address(wallet_address) -> bool:
+    return isinstance(wallet_address, str) and ADDRESS_PATTERN.fullmatch(wallet_address) is not None
+
+
+def address_bytes(wallet_address: str) -> bytes:
+    if not is_address(wallet_address):
+        raise ValueError(f"{wallet_address} is not a 20-byte address")
+    return bytes.fromhex(wallet_address[2:])
+
+
+def leaf_hash(wallet_address: str, amount: int) -> bytes:
+    # Same leaf encoding as OpenZeppelin's StandardMerkleTree for (address, uint256).
+    encoded = bytes(12) + address_bytes(wallet_address) + amount.to_bytes(32, "big")
+    return keccak256(keccak256(encoded))
+
+
+def hash_pair(a: bytes, b: bytes) -> bytes:
+    return keccak256(a + b if a < b else b + a)
+
+
+# Every level of the tree, sorted leaves first and the root last, is kept in one
+# contiguous buffer of 32-byte hashes.
+def build_tree(entries: list[tuple[str, int]]) -> bytes:
+    level = sorted(leaf_hash(wallet, amount) for wallet, amount in entries)
+    nodes = bytearray(b"".join(level))
+    while len(level) > 1:
+        parents = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        nodes += b"".join(parents)
+        level = parents
+    return bytes(nodes)
+
+
+def root(nodes: bytes) -> bytes:
+    return nodes[-HASH_SIZE:]
+
+
+def node(nodes: bytes, index: int) -> bytes:
+    return nodes[index * HASH_SIZE:(index + 1) * HASH_SIZE]
+
+
+def leaf_index(nodes: bytes, leaf_count: int, leaf: bytes) -> int | None:
+    index = bisect_left(range(leaf_count), leaf, key=lambda i: node(nodes, i))
+    if index < leaf_count and node(nodes, index) == leaf:
+        return index
+    return None
+
+
+def proof(nodes: bytes, leaf_count: int, index: int) -> list[bytes]:
+    siblings = []
+    offset, size = 0, leaf_count
+    while size > 1:
+        sibling = index ^ 1
+        if sibling < size:
+            siblings.append(node(nodes, offset + sibling))
+        offset += size
+        index //= 2
+        size = (size + 1) // 2
+    return siblings
+
@@ -0,0 +1,251 @@
+import math
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from fastapi import Response
+from sqlalchemy import event
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets) + (math.inf,)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[_format_bound(bound)] = cumulative
+        return {"buckets": buckets, "sum": self.sum, "count": self.count}
+
+
+class Value:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Metric:
+    # Every worker serves from a single event loop thread, so children are
+    # plain attribute updates without locks.
+    def __init__(self, kind: str, name: str, documentation: str, labelnames=(), **options):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.options = options
+        self._children = {}
+        registry.register(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            child = Histogram(**self.options) if self.kind == "histogram" else Value()
+            self._children[values] = child
+        return child
+
+    def expose(self):
+        return family_samples(
+            self.kind,
+            self.name,
+            self.documentation,
+            (
+                (
+                    dict(zip(self.labelnames, values)),
+                    child if self.kind == "histogram" else child.value,
+                )
+                for values, child in list(self._children.items())
+            ),
+        )
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric: Metric):
+        self.metrics.append(metric)
+
+    def register_collector(self, collector):
+        self.collectors.append(collector)
+
+    def expose(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.expose())
+        for collector in self.collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+def histogram_samples(name: str, labels: dict, histogram: Histogram):
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        bucket_labels = {**labels, "le": _format_bound(bound)}
+        yield f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+    yield f"{name}_sum{_format_labels(labels)} {histogram.sum}"
+    yield f"{name}_count{_format_labels(labels)} {histogram.count}"
+
+
+def family_samples(kind: str, name: str, documentation: str, samples):
+    yield f"# HELP {name} {documentation}"
+    yield f"# TYPE {name} {kind}"
+    for labels, value in samples:
+        if kind == "histogram":
+            yield from histogram_samples(name, labels, value)
+        else:
+            yield f"{name}{_format_labels(labels)} {value}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(float(bound))
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = Metric(
+    "counter",
+    "http_requests_total",
+    "HTTP requests handled.",
+    ("method", "route", "status"),
+)
+HTTP_IN_FLIGHT = Metric(
+    "gauge", "http_requests_in_flight", "HTTP requests currently being served."
+)
+HTTP_LATENCY = Metric(
+    "histogram",
+    "http_request_duration_seconds",
+    "HTTP request latency.",
+    ("method", "route"),
+)
+DB_QUERIES = Metric("counter", "db_queries_total", "SQL statements executed.")
+DB_QUERY_LATENCY = Metric(
+    "histogram", "db_query_duration_seconds", "SQL statement latency."
+)
+DB_QUERIES_PER_REQUEST = Metric(
+    "histogram",
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request.",
+    ("route",),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_TIME_PER_REQUEST = Metric(
+    "histogram",
+    "http_request_db_duration_seconds",
+    "Time spent in SQL statements per HTTP request.",
+    ("route",),
+)
+
+_in_flight = HTTP_IN_FLIGHT.labels()
+_db_queries = DB_QUERIES.labels()
+_db_query_latency = DB_QUERY_LATENCY.labels()
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar(
+    "current_request", default=None
+)
+
+
+def route_template(scope) -> str:
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+class PrometheusMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        _in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            _in_flight.dec()
+            current_request.reset(token)
+            route = route_template(scope)
+            HTTP_REQUESTS.labels(scope["method"], route, str(status)).inc()
+            HTTP_LATENCY.labels(scope["method"], route).observe(duration)
+            DB_QUERIES_PER_REQUEST.labels(route).observe(stats.queries)
+            DB_TIME_PER_REQUEST.labels(route).observe(stats.db_time)
+
+
+def instrument_engine(engine):
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop("query_start")
+        _db_queries.inc()
+        _db_query_latency.observe(elapsed)
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+
+
+def metrics_response() -> Response:
+    return Response(content=registry.expose(), media_type=CONTENT_TYPE)
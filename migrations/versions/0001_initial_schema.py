@@ -0,0 +1,85 @@
+"""initial schema
+
+Tables may already exist on databases created by Base.metadata.create_all,
+so each one is only created when missing. event_stats is backfilled from any
+bets already stored.
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-09-08
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "events" not in existing:
+        op.create_table(
+            "events",
+            sa.Column("request_id", sa.String(), primary_key=True, index=True),
+            sa.Column("title", sa.String()),
+            sa.Column("description", sa.String()),
+            sa.Column("due_date", sa.BigInteger()),
+            sa.Column("predict", sa.JSON(), nullable=True),
+            sa.Column("contracts", sa.JSON(), nullable=True),
+        )
+
+    if "bets" not in existing:
+        op.create_table(
+            "bets",
+            sa.Column("id", sa.Integer(), primary_key=True, index=True),
+            sa.Column(
+                "event_request_id",
+                sa.String(),
+                sa.ForeignKey("events.request_id"),
+            ),
+            sa.Column("wallet_address", sa.String(), index=True),
+            sa.Column("prediction", sa.Enum("YES", "NO", name="prediction_type")),
+            sa.Column("tokens", sa.Float()),
+            sa.Column("token_name", sa.String()),
+        )
+
+    if "event_stats" not in existing:
+        op.create_table(
+            "event_stats",
+            sa.Column(
+                "event_request_id",
+                sa.String(),
+                sa.ForeignKey("events.request_id"),
+                primary_key=True,
+            ),
+            sa.Column("total_bets", sa.Integer(), nullable=False),
+            sa.Column("total_tokens", sa.Float(), nullable=False),
+            sa.Column("yes_bets", sa.Integer(), nullable=False),
+            sa.Column("no_bets", sa.Integer(), nullable=False),
+        )
+        op.execute(
+            """
+            INSERT INTO event_stats (
+                event_request_id, total_bets, total_tokens, yes_bets, no_bets
+            )
+            SELECT
+                event_request_id,
+                count(*),
+                coalesce(sum(tokens), 0),
+                sum(CASE WHEN prediction = 'YES' THEN 1 ELSE 0 END),
+                sum(CASE WHEN prediction = 'NO' THEN 1 ELSE 0 END)
+            FROM bets
+            GROUP BY event_request_id
+            """
+        )
+
+
+def downgrade():
+    op.drop_table("event_stats")
+    op.drop_table("bets")
+    op.drop_table("events")
+    sa.Enum(name="prediction_type").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,49 @@
+"""bet indexes for event lookups, stats and largest bet
+
+On PostgreSQL the indexes are built CONCURRENTLY so bet writes are not
+blocked while they build.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-09-08
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_bets_event_request_id_id", ["event_request_id", "id"]),
+    (
+        "ix_bets_event_request_id_prediction_tokens",
+        ["event_request_id", "prediction", "tokens"],
+    ),
+    ("ix_bets_tokens_desc", [sa.text("tokens DESC")]),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(
+                name,
+                "bets",
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name="bets",
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,59 @@
+"""event outcome and payouts table
+
+The column, table and index may already exist on databases created by
+Base.metadata.create_all, so each one is only created when missing.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-09-08
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if "outcome" not in {column["name"] for column in inspector.get_columns("events")}:
+        op.add_column(
+            "events",
+            sa.Column(
+                "outcome",
+                sa.Enum("YES", "NO", name="prediction_type", create_type=False),
+                nullable=True,
+            ),
+        )
+
+    if "payouts" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "payouts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "event_request_id",
+            sa.String(),
+            sa.ForeignKey("events.request_id"),
+            nullable=False,
+        ),
+        sa.Column("wallet_address", sa.String(), nullable=False),
+        sa.Column("token_name", sa.String(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+    )
+    op.create_index(
+        "ix_payouts_event_request_id_wallet_address",
+        "payouts",
+        ["event_request_id", "wallet_address"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_payouts_event_request_id_wallet_address", table_name="payouts")
+    op.drop_table("payouts")
+    op.drop_column("events", "outcome")
@@ -0,0 +1,40 @@
+"""payout merkle trees
+
+The table may already exist on databases created by Base.metadata.create_all,
+so it is only created when missing.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-09-08
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if "merkle_trees" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "merkle_trees",
+        sa.Column(
+            "event_request_id",
+            sa.String(),
+            sa.ForeignKey("events.request_id"),
+            primary_key=True,
+        ),
+        sa.Column("token_name", sa.String(), primary_key=True),
+        sa.Column("root", sa.String(), nullable=False),
+        sa.Column("leaf_count", sa.Integer(), nullable=False),
+        sa.Column("nodes", sa.LargeBinary(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("merkle_trees")
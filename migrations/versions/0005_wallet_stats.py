@@ -0,0 +1,79 @@
+"""wallet stats and lowercase wallet addresses
+
+Existing wallet addresses are lowercased so lookups by address hit
+ix_bets_wallet_address_id, and wallet_stats is backfilled from bets. The
+table may already exist, possibly partly filled, on databases created by
+Base.metadata.create_all, so it is only created when missing and always
+rebuilt.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-09-08
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("UPDATE bets SET wallet_address = lower(wallet_address)")
+    op.execute("UPDATE payouts SET wallet_address = lower(wallet_address)")
+    if "wallet_stats" not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            "wallet_stats",
+            sa.Column("wallet_address", sa.String(), primary_key=True),
+            sa.Column(
+                "event_request_id",
+                sa.String(),
+                sa.ForeignKey("events.request_id"),
+                primary_key=True,
+            ),
+            sa.Column("token_name", sa.String(), primary_key=True),
+            sa.Column("total_bets", sa.Integer(), nullable=False),
+            sa.Column("total_tokens", sa.Float(), nullable=False),
+            sa.Column("yes_tokens", sa.Float(), nullable=False),
+            sa.Column("no_tokens", sa.Float(), nullable=False),
+        )
+    op.execute("DELETE FROM wallet_stats")
+    op.execute(
+        """
+        INSERT INTO wallet_stats (
+            wallet_address, event_request_id, token_name,
+            total_bets, total_tokens, yes_tokens, no_tokens
+        )
+        SELECT
+            wallet_address,
+            event_request_id,
+            token_name,
+            count(*),
+            coalesce(sum(tokens), 0),
+            coalesce(sum(CASE WHEN prediction = 'YES' THEN tokens ELSE 0 END), 0),
+            coalesce(sum(CASE WHEN prediction = 'NO' THEN tokens ELSE 0 END), 0)
+        FROM bets
+        GROUP BY wallet_address, event_request_id, token_name
+        """
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_bets_wallet_address_id",
+            "bets",
+            ["wallet_address", "id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_bets_wallet_address_id",
+            table_name="bets",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_table("wallet_stats")
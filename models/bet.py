@@ -1,6 +1,6 @@
 from typing import Literal
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 from pydantic.alias_generators import to_camel
 
 
@@ -14,11 +14,16 @@ class BaseSchema(BaseModel):
 
 class BetCreate(BaseSchema):
     event_request_id: str
-    wallet_address: str
+    wallet_address: str = Field(pattern=r"^0x[0-9a-fA-F]{40}$")
     prediction: Literal["YES", "NO"]
     tokens: float = Field(gt=0)
     token_name: str
 
+    @field_validator("wallet_address")
+    @classmethod
+    def normalize_wallet_address(cls, wallet_address: str) -> str:
+        return wallet_address.lower()
+
 
 class BetResponse(BetCreate):
     id: int
@@ -38,3 +43,14 @@ class BetWithEventTitle(BaseSchema):
 
     class Config:
         from_attributes = True
+
+
+class BetBatchItemResult(BaseSchema):
+    index: int
+    id: int | None = None
+    error: str | None = None
+
+
+class BetBatchResponse(BaseSchema):
+    inserted: int
+    results: list[BetBatchItemResult]
@@ -1,4 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic.alias_generators import to_camel
 
 
@@ -34,6 +36,63 @@ class EventResponse(BaseSchema):
     due_date: int
     predict: PredictInfo | None = None
     contracts: dict[str, str] | None = None
+    outcome: Literal["YES", "NO"] | None = None
 
     class Config:
         from_attributes = True
+
+
+class EventResolve(BaseSchema):
+    outcome: Literal["YES", "NO"]
+
+
+class TokenPool(BaseSchema):
+    total_pool: float
+    winning_pool: float
+
+
+class EventResolution(BaseSchema):
+    request_id: str
+    outcome: Literal["YES", "NO"]
+    total_bets: int
+    winning_bets: int
+    payouts: int
+    pools: dict[str, TokenPool]
+    merkle_roots: dict[str, str]
+
+
+class PayoutProof(BaseSchema):
+    token_name: str
+    amount: float
+    amount_units: str
+    leaf: str
+    proof: list[str]
+    root: str
+
+
+class WalletProofs(BaseSchema):
+    request_id: str
+    wallet_address: str
+    proofs: list[PayoutProof]
+
+
+class TokenOdds(BaseSchema):
+    yes_pool: float
+    no_pool: float
+    total_pool: float
+    yes_probability: float | None
+    no_probability: float | None
+
+
+class EventOdds(BaseSchema):
+    request_id: str
+    pools: dict[str, TokenOdds]
+
+
+class EventLookup(BaseSchema):
+    ids: list[str] = Field(min_length=1, max_length=500)
+
+
+class EventLookupResponse(BaseSchema):
+    events: list[EventResponse]
+    missing: list[str]
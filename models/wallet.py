@@ -0,0 +1,29 @@
+from pydantic import BaseModel, ConfigDict
+from pydantic.alias_generators import to_camel
+
+
+class BaseSchema(BaseModel):
+    model_config = ConfigDict(
+        alias_generator=to_camel,
+        populate_by_name=True,
+        from_attributes=True,
+    )
+
+
+class TokenExposure(BaseSchema):
+    total_bets: int
+    total_tokens: float
+    yes_tokens: float
+    no_tokens: float
+
+
+class EventExposure(TokenExposure):
+    event_request_id: str
+    token_name: str
+
+
+class WalletSummary(BaseSchema):
+    wallet_address: str
+    total_bets: int
+    events: list[EventExposure]
+    tokens: dict[str, TokenExposure]
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+import orjson
+from sqlalchemy import select, func
+
+from database import WalletStats, AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def implied_probability(pool: float, total: float) -> float | None:
+    return pool / total if total else None
+
+
+class OddsBook:
+    def __init__(self):
+        self._pools = {}
+        self._payloads = {}
+        self._loading = None
+
+    def __contains__(self, event_request_id: str) -> bool:
+        return event_request_id in self._pools
+
+    def add(self, event_request_id: str, token_name: str, prediction: str, tokens: float):
+        pools = self._pools.setdefault(event_request_id, {})
+        pool = pools.setdefault(token_name, [0.0, 0.0])
+        pool[0 if prediction == "YES" else 1] += tokens
+        self._payloads.pop(event_request_id, None)
+        if self._loading is not None:
+            self._loading.append((event_request_id, token_name, prediction, tokens))
+
+    def replace(self, pools: dict, pending=()):
+        self._pools = pools
+        self._payloads = {}
+        for bet in pending:
+            self.add(*bet)
+
+    def odds(self, event_request_id: str) -> dict:
+        return {
+            "requestId": event_request_id,
+            "pools": {
+                token_name: {
+                    "yesPool": yes,
+                    "noPool": no,
+                    "totalPool": yes + no,
+                    "yesProbability": implied_probability(yes, yes + no),
+                    "noProbability": implied_probability(no, yes + no),
+                }
+                for token_name, (yes, no) in sorted(
+                    self._pools.get(event_request_id, {}).items()
+                )
+            },
+        }
+
+    def payload(self, event_request_id: str) -> bytes:
+        payload = self._payloads.get(event_request_id)
+        if payload is None:
+            payload = orjson.dumps(self.odds(event_request_id))
+            if event_request_id in self._pools:
+                self._payloads[event_request_id] = payload
+        return payload
+
+    async def load(self):
+        # wallet_stats already holds YES/NO tokens per event and token, so
+        # this never has to aggregate the bets table.
+        # Bets added while the query runs may be missing from its result, so
+        # they are replayed on top of it.
+        self._loading = []
+        try:
+            async with AsyncSessionLocal() as db:
+                rows = await db.execute(
+                    select(
+                        WalletStats.event_request_id,
+                        WalletStats.token_name,
+                        func.sum(WalletStats.yes_tokens),
+                        func.sum(WalletStats.no_tokens),
+                    ).group_by(WalletStats.event_request_id, WalletStats.token_name)
+                )
+            pools = defaultdict(dict)
+            for event_request_id, token_name, yes, no in rows:
+                pools[event_request_id][token_name] = [float(yes), float(no)]
+            pending, self._loading = self._loading, None
+            self.replace(dict(pools), pending)
+        finally:
+            self._loading = None
+
+    async def reconcile_forever(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Odds reconciliation failed")
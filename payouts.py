@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from decimal import ROUND_FLOOR, Decimal
+from multiprocessing import get_context
+
+import numpy as np
+from sqlalchemy import delete, insert, select, update
+
+import merkle
+from database import Bet, Event, MerkleTree, Payout, AsyncSessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+LOAD_BATCH_SIZE = 50000
+INSERT_CHUNK_SIZE = 10000
+PAYOUT_DECIMALS = int(os.environ.get("PAYOUT_DECIMALS", 18))
+MERKLE_PROCESS_POOL_THRESHOLD = int(os.environ.get("MERKLE_PROCESS_POOL_THRESHOLD", 10000))
+MERKLE_ROOT_KEY = "merkleRoot:{token_name}"
+
+_tree_pool = None
+
+
+def compute_payouts(wallets, predictions, tokens, token_names, outcome: str):
+    wallets = np.asarray(wallets, dtype=str)
+    token_names = np.asarray(token_names, dtype=str)
+    tokens = np.asarray(tokens, dtype=np.float64)
+    winning = np.asarray(predictions, dtype=str) == outcome
+
+    token_keys, token_index = np.unique(token_names, return_inverse=True)
+    pools = np.bincount(
+        token_index, weights=tokens, minlength=len(token_keys)
+    ).astype(np.float64)
+    winning_pools = np.bincount(
+        token_index, weights=np.where(winning, tokens, 0.0), minlength=len(token_keys)
+    ).astype(np.float64)
+
+    # A token pool nobody won is refunded to everyone who bet in it.
+    ratios = np.divide(
+        pools, winning_pools, out=np.zeros_like(pools), where=winning_pools > 0
+    )
+    refund = winning_pools[token_index] == 0
+    amounts = np.where(refund, tokens, np.where(winning, tokens * ratios[token_index], 0.0))
+
+    paid = amounts > 0
+    wallet_keys, wallet_index = np.unique(wallets[paid], return_inverse=True)
+    pairs = wallet_index * max(len(token_keys), 1) + token_index[paid]
+    pair_keys, pair_index = np.unique(pairs, return_inverse=True)
+    totals = np.bincount(pair_index, weights=amounts[paid]).astype(np.float64)
+
+    payouts = {
+        "wallet_address": wallet_keys[pair_keys // max(len(token_keys), 1)],
+        "token_name": token_keys[pair_keys % max(len(token_keys), 1)],
+        "amount": totals,
+    }
+    summary = {
+        "total_bets": len(tokens),
+        "winning_bets": int(winning.sum()),
+        "payouts": len(totals),
+        "pools": {
+            str(token): {"total_pool": float(pool), "winning_pool": float(winning_pool)}
+            for token, pool, winning_pool in zip(token_keys, pools, winning_pools)
+        },
+    }
+    return payouts, summary
+
+
+async def load_bet_columns(db, request_id: str):
+    wallets, predictions, tokens, token_names = [], [], [], []
+    result = await db.stream(
+        select(Bet.wallet_address, Bet.prediction, Bet.tokens, Bet.token_name)
+        .where(Bet.event_request_id == request_id)
+        .execution_options(yield_per=LOAD_BATCH_SIZE)
+    )
+    async for partition in result.partitions():
+        columns = list(zip(*partition))
+        wallets.extend(columns[0])
+        predictions.extend(columns[1])
+        tokens.extend(columns[2])
+        token_names.extend(columns[3])
+    return wallets, predictions, tokens, token_names
+
+
+async def write_payouts(db, request_id: str, payouts: dict):
+    columns = ("event_request_id", "wallet_address", "token_name", "amount")
+    records = [
+        (request_id, str(wallet), str(token), float(amount))
+        for wallet, token, amount in zip(
+            payouts["wallet_address"], payouts["token_name"], payouts["amount"]
+        )
+    ]
+    if not records:
+        return
+
+    if db.get_bind().dialect.name == "postgresql":
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            Payout.__tablename__, records=records, columns=columns
+        )
+        return
+
+    for start in range(0, len(records), INSERT_CHUNK_SIZE):
+        await db.execute(
+            insert(Payout),
+            [dict(zip(columns, record)) for record in records[start:start + INSERT_CHUNK_SIZE]],
+        )
+
+
+async def resolve_payouts(db, request_id: str, outcome: str):
+    wallets, predictions, tokens, token_names = await load_bet_columns(db, request_id)
+    payouts, summary = await asyncio.to_thread(
+        compute_payouts, wallets, predictions, tokens, token_names, outcome
+    )
+    await write_payouts(db, request_id, payouts)
+    summary["merkle_roots"] = await build_payout_trees(
+        db,
+        request_id,
+        zip(payouts["wallet_address"], payouts["token_name"], payouts["amount"]),
+    )
+    return summary
+
+
+def to_units(amount: float) -> int:
+    # Rounding down keeps the committed units from adding up to more than the pool.
+    amount = Decimal(repr(float(amount))) * 10 ** PAYOUT_DECIMALS
+    return int(amount.to_integral_value(rounding=ROUND_FLOOR))
+
+
+def tree_pool() -> ProcessPoolExecutor:
+    global _tree_pool
+    if _tree_pool is None:
+        _tree_pool = ProcessPoolExecutor(mp_context=get_context("spawn"))
+    return _tree_pool
+
+
+def shutdown_tree_pool():
+    global _tree_pool
+    if _tree_pool is not None:
+        _tree_pool.shutdown()
+        _tree_pool = None
+
+
+async def build_payout_trees(db, request_id: str, payouts=None) -> dict[str, str]:
+    if payouts is None:
+        payouts = await db.execute(
+            select(Payout.wallet_address, Payout.token_name, Payout.amount)
+            .where(Payout.event_request_id == request_id)
+        )
+    entries = defaultdict(list)
+    for wallet, token_name, amount in payouts:
+        # Bets from before addresses were validated may not have one, and
+        # must not make the whole event unresolvable.
+        if not merkle.is_address(wallet):
+            logger.warning(
+                "Leaving payout to %r on %s out of the Merkle tree: not an address",
+                wallet,
+                request_id,
+            )
+            continue
+        entries[str(token_name)].append((str(wallet), to_units(amount)))
+
+    loop = asyncio.get_running_loop()
+    builds = [
+        loop.run_in_executor(tree_pool(), merkle.build_tree, token_entries)
+        if len(token_entries) >= MERKLE_PROCESS_POOL_THRESHOLD
+        else asyncio.to_thread(merkle.build_tree, token_entries)
+        for token_entries in entries.values()
+    ]
+    trees = dict(zip(entries, await asyncio.gather(*builds)))
+
+    await db.execute(delete(MerkleTree).where(MerkleTree.event_request_id == request_id))
+    roots = {}
+    for token_name, nodes in trees.items():
+        roots[token_name] = "0x" + merkle.root(nodes).hex()
+        await db.execute(
+            insert(MerkleTree).values(
+                event_request_id=request_id,
+                token_name=token_name,
+                root=roots[token_name],
+                leaf_count=len(entries[token_name]),
+                nodes=nodes,
+            )
+        )
+
+    contracts = await db.scalar(select(Event.contracts).where(Event.request_id == request_id))
+    contracts = {
+        key: value
+        for key, value in (contracts or {}).items()
+        if not key.startswith(MERKLE_ROOT_KEY.format(token_name=""))
+    }
+    contracts.update(
+        {MERKLE_ROOT_KEY.format(token_name=token_name): root for token_name, root in roots.items()}
+    )
+    await db.execute(
+        update(Event).where(Event.request_id == request_id).values(contracts=contracts)
+    )
+    return roots
+
+
+async def load_tree(db, request_id: str, token_name: str, tree_cache):
+    key = (request_id, token_name)
+    tree = tree_cache.get(key, None)
+    if tree is None:
+        row = (await db.execute(
+            select(MerkleTree.root, MerkleTree.leaf_count, MerkleTree.nodes).where(
+                MerkleTree.event_request_id == request_id,
+                MerkleTree.token_name == token_name,
+            )
+        )).first()
+        if row is None:
+            return None
+        tree = (row.root, row.leaf_count, bytes(row.nodes))
+        tree_cache.set(key, tree)
+    return tree
+
+
+async def payout_proofs(db, request_id: str, wallet_address: str, tree_cache) -> list[dict]:
+    payouts = await db.execute(
+        select(Payout.token_name, Payout.amount).where(
+            Payout.event_request_id == request_id,
+            Payout.wallet_address == wallet_address,
+        )
+    )
+    proofs = []
+    for token_name, amount in payouts:
+        tree = await load_tree(db, request_id, token_name, tree_cache)
+        if tree is None:
+            continue
+        root, leaf_count, nodes = tree
+        units = to_units(amount)
+        leaf = merkle.leaf_hash(wallet_address, units)
+        index = merkle.leaf_index(nodes, leaf_count, leaf)
+        if index is None:
+            continue
+        proofs.append({
+            "token_name": token_name,
+            "amount": amount,
+            "amount_units": str(units),
+            "leaf": "0x" + leaf.hex(),
+            "proof": ["0x" + sibling.hex() for sibling in merkle.proof(nodes, leaf_count, index)],
+            "root": root,
+        })
+    return proofs
+
+
+async def main(request_id: str):
+    async with AsyncSessionLocal() as db:
+        roots = await build_payout_trees(db, request_id)
+        await db.commit()
+    await engine.dispose()
+    for token_name, root in roots.items():
+        print(f"{token_name}: {root}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1]))
@@ -0,0 +1,119 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+MAX_LOGGED_PARAMETERS = 500
+
+
+class QueryProfile:
+    __slots__ = ("scope", "queries", "db_time", "shapes")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+
+    def repeated_shapes(self, threshold: int):
+        return [
+            (statement, count)
+            for statement, count in self.shapes.items()
+            if count >= threshold
+        ]
+
+
+current_profile: ContextVar[QueryProfile | None] = ContextVar(
+    "current_profile", default=None
+)
+
+
+class QueryProfiler:
+    def __init__(self, slow_query_threshold: float = 0.1, n_plus_one_threshold: int = 5):
+        self.slow_query_threshold = slow_query_threshold
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    def instrument_engine(self, engine):
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info["profile_start"] = time.perf_counter()
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info.pop("profile_start")
+            profile = current_profile.get()
+            if profile is not None:
+                profile.queries += 1
+                profile.db_time += elapsed
+                profile.shapes[statement] += 1
+            if elapsed >= self.slow_query_threshold:
+                logger.warning(
+                    "Slow query (%.1f ms) on %s: %s parameters=%.*s",
+                    elapsed * 1000,
+                    route_template(profile.scope) if profile is not None else "-",
+                    statement,
+                    MAX_LOGGED_PARAMETERS,
+                    repr(parameters),
+                )
+
+    def server_timing(self, profile: QueryProfile, elapsed: float) -> str:
+        entries = [
+            f'db;dur={profile.db_time * 1000:.2f};desc="{profile.queries} queries"',
+            f"app;dur={elapsed * 1000:.2f}",
+        ]
+        repeated = profile.repeated_shapes(self.n_plus_one_threshold)
+        if repeated:
+            entries.append(f'n-plus-one;desc="{len(repeated)} repeated statements"')
+        return ", ".join(entries)
+
+
+class QueryProfilingMiddleware:
+    def __init__(self, app, profiler: QueryProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile(scope)
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                server_timing = self.profiler.server_timing(
+                    profile, time.perf_counter() - start
+                )
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"server-timing", server_timing.encode()),
+                    ],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            for statement, count in profile.repeated_shapes(
+                self.profiler.n_plus_one_threshold
+            ):
+                logger.warning(
+                    "Possible N+1 on %s %s: statement ran %d times: %s",
+                    scope["method"],
+                    route_template(scope),
+                    count,
+                    statement,
+                )
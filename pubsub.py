@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from collections import defaultdict, deque
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, max_pending: int, include_stats: bool):
+        self.max_pending = max_pending
+        self.include_stats = include_stats
+        self.overflowed = False
+        self._bets = deque()
+        self._stats = None
+        self._ready = asyncio.Event()
+
+    def push(self, message: dict):
+        for bet in message.get("bets", ()):
+            if len(self._bets) >= self.max_pending:
+                self.overflowed = True
+                break
+            self._bets.append(bet)
+        if self.include_stats and message.get("stats") is not None:
+            self._stats = message["stats"]
+        self._ready.set()
+
+    async def next(self, timeout: float):
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._ready.clear()
+        bets, self._bets = list(self._bets), deque()
+        stats, self._stats = self._stats, None
+        return bets, stats
+
+
+class LocalBackend:
+    def __init__(self):
+        self._dispatch = None
+
+    async def start(self, dispatch):
+        self._dispatch = dispatch
+
+    async def publish(self, event_request_id: str, message: dict):
+        self._dispatch(event_request_id, message)
+
+    async def stop(self):
+        pass
+
+
+class RedisBackend:
+    def __init__(self, url: str, prefix: str = "bets:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._prefix = prefix
+        self._listener = None
+
+    async def start(self, dispatch):
+        pubsub = self._redis.pubsub()
+        await pubsub.psubscribe(f"{self._prefix}*")
+        self._listener = asyncio.create_task(self._listen(pubsub, dispatch))
+
+    async def _listen(self, pubsub, dispatch):
+        async for item in pubsub.listen():
+            if item["type"] != "pmessage":
+                continue
+            try:
+                channel = item["channel"].decode()
+                dispatch(channel[len(self._prefix):], orjson.loads(item["data"]))
+            except Exception:
+                logger.exception("Dropping a malformed bet feed message")
+
+    async def publish(self, event_request_id: str, message: dict):
+        await self._redis.publish(f"{self._prefix}{event_request_id}", orjson.dumps(message))
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+        await self._redis.aclose()
+
+
+class BetHub:
+    def __init__(self, backend, max_pending: int = 1000):
+        self.backend = backend
+        self.max_pending = max_pending
+        self._subscribers = defaultdict(set)
+        self._listeners = []
+
+    @property
+    def shared(self) -> bool:
+        return not isinstance(self.backend, LocalBackend)
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    async def start(self):
+        await self.backend.start(self.dispatch)
+
+    async def stop(self):
+        await self.backend.stop()
+
+    def subscribe(self, event_request_id: str, include_stats: bool = False) -> Subscription:
+        subscription = Subscription(self.max_pending, include_stats)
+        self._subscribers[event_request_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, event_request_id: str, subscription: Subscription):
+        subscribers = self._subscribers.get(event_request_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[event_request_id]
+
+    def wants(self, event_request_id: str) -> bool:
+        return self.shared or event_request_id in self._subscribers
+
+    def dispatch(self, event_request_id: str, message: dict):
+        for listener in self._listeners:
+            try:
+                listener(event_request_id, message)
+            except Exception:
+                logger.exception("A bet feed listener failed")
+        for subscription in list(self._subscribers.get(event_request_id, ())):
+            subscription.push(message)
+
+    async def publish(self, event_request_id: str, message: dict):
+        if not self.wants(event_request_id):
+            return
+        try:
+            await self.backend.publish(event_request_id, message)
+        except Exception:
+            logger.exception("Publishing to the bet feed failed")
@@ -0,0 +1,140 @@
+import asyncio
+import itertools
+import logging
+import os
+import time
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from database import AsyncSessionLocal, async_database_url, engine, engine_options
+
+logger = logging.getLogger(__name__)
+
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class ReplicaPool:
+    def __init__(self, urls: list[str], health_check_timeout: float = 2.0):
+        self.engines = [
+            create_async_engine(async_database_url(url), **engine_options())
+            for url in urls
+        ]
+        self.sessionmakers = [
+            async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+            for engine in self.engines
+        ]
+        self.healthy = [True] * len(self.engines)
+        self.health_check_timeout = health_check_timeout
+        self._next = itertools.count()
+
+    def sessionmaker(self):
+        for _ in range(len(self.sessionmakers)):
+            index = next(self._next) % len(self.sessionmakers)
+            if self.healthy[index]:
+                return self.sessionmakers[index]
+        return AsyncSessionLocal
+
+    async def check_health(self):
+        for index, engine in enumerate(self.engines):
+            try:
+                await asyncio.wait_for(self._ping(engine), self.health_check_timeout)
+                healthy = True
+            except Exception:
+                healthy = False
+            if healthy != self.healthy[index]:
+                logger.warning(
+                    "Replica %s is now %s",
+                    engine.url.render_as_string(hide_password=True),
+                    "healthy" if healthy else "unhealthy",
+                )
+            self.healthy[index] = healthy
+
+    @staticmethod
+    async def _ping(engine):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def check_health_forever(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.check_health()
+
+    async def dispose(self):
+        for engine in self.engines:
+            await engine.dispose()
+
+
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+READ_YOUR_WRITES_WINDOW = float(os.environ.get("READ_YOUR_WRITES_WINDOW", 5))
+
+replicas = ReplicaPool(DATABASE_REPLICA_URLS) if DATABASE_REPLICA_URLS else None
+
+
+def pinned_to_primary(request: Request) -> bool:
+    last_write = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(
+        LAST_WRITE_COOKIE
+    )
+    try:
+        return time.time() - float(last_write) < READ_YOUR_WRITES_WINDOW
+    except (TypeError, ValueError):
+        return False
+
+
+def read_sessionmaker(request: Request):
+    if replicas is None or pinned_to_primary(request):
+        return AsyncSessionLocal
+    return replicas.sessionmaker()
+
+
+async def get_read_db(request: Request):
+    async with read_sessionmaker(request)() as db:
+        yield db
+
+
+def reads_from_primary(db) -> bool:
+    return db.get_bind() is engine.sync_engine
+
+
+def last_write_headers() -> list[tuple[bytes, bytes]]:
+    now = f"{time.time():.6f}"
+    max_age = int(READ_YOUR_WRITES_WINDOW) + 1
+    return [
+        (LAST_WRITE_HEADER.lower().encode(), now.encode()),
+        (
+            b"set-cookie",
+            f"{LAST_WRITE_COOKIE}={now}; Max-Age={max_age}; Path=/; SameSite=lax".encode(),
+        ),
+    ]
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app, read_only_paths=()):
+        self.app = app
+        self.read_only_paths = frozenset(read_only_paths)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in WRITE_METHODS
+            or scope["path"] in self.read_only_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_last_write(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), *last_write_headers()],
+                }
+            await send(message)
+
+        await self.app(scope, receive, send_with_last_write)
@@ -0,0 +1,59 @@
+import orjson
+from fastapi import Response
+from pydantic.alias_generators import to_camel
+
+from database import Bet, Event
+
+EVENT_COLUMNS = (
+    Event.request_id,
+    Event.title,
+    Event.description,
+    Event.due_date,
+    Event.predict,
+    Event.contracts,
+    Event.outcome,
+)
+
+BET_COLUMNS = (
+    Bet.event_request_id,
+    Bet.wallet_address,
+    Bet.prediction,
+    Bet.tokens,
+    Bet.token_name,
+    Bet.id,
+)
+
+BET_WITH_EVENT_TITLE_COLUMNS = (
+    Bet.id,
+    Bet.event_request_id,
+    Event.title.label("event_title"),
+    Bet.wallet_address,
+    Bet.prediction,
+    Bet.tokens,
+    Bet.token_name,
+)
+
+
+def camel_keys(columns):
+    return tuple(to_camel(column.key) for column in columns)
+
+
+def camel_dict(row: dict) -> dict:
+    return {to_camel(key): value for key, value in row.items()}
+
+
+def dump_rows(rows, keys) -> list[dict]:
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def json_response(content, status_code: int = 200, headers=None) -> Response:
+    return Response(
+        content=orjson.dumps(content),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def ndjson_lines(rows, keys) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(keys, row))) + b"\n" for row in rows)
@@ -0,0 +1,151 @@
+import asyncio
+from collections import defaultdict
+
+from sqlalchemy import delete, insert, select, func, case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import (
+    Bet,
+    EventStats,
+    WalletStats,
+    AsyncSessionLocal,
+    upgrade_schema,
+    engine,
+)
+
+_DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert_insert(db: AsyncSession, table):
+    dialect = db.get_bind().dialect.name
+    if dialect not in _DIALECT_INSERTS:
+        raise RuntimeError(f"Upserts are not supported on {dialect}")
+    return _DIALECT_INSERTS[dialect](table)
+
+
+async def record_bets(db: AsyncSession, bets):
+    deltas = defaultdict(lambda: {"total_bets": 0, "total_tokens": 0.0, "yes_bets": 0, "no_bets": 0})
+    wallet_deltas = defaultdict(lambda: {"total_bets": 0, "total_tokens": 0.0, "yes_tokens": 0.0, "no_tokens": 0.0})
+    for bet in bets:
+        delta = deltas[bet["event_request_id"]]
+        delta["total_bets"] += 1
+        delta["total_tokens"] += bet["tokens"]
+        delta["yes_bets" if bet["prediction"] == "YES" else "no_bets"] += 1
+
+        wallet_delta = wallet_deltas[bet["wallet_address"], bet["event_request_id"], bet["token_name"]]
+        wallet_delta["total_bets"] += 1
+        wallet_delta["total_tokens"] += bet["tokens"]
+        wallet_delta["yes_tokens" if bet["prediction"] == "YES" else "no_tokens"] += bet["tokens"]
+
+    if not deltas:
+        return {}
+
+    await record_wallet_bets(db, wallet_deltas)
+
+    stmt = upsert_insert(db, EventStats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EventStats.event_request_id],
+        set_={
+            column: getattr(EventStats, column) + getattr(stmt.excluded, column)
+            for column in ("total_bets", "total_tokens", "yes_bets", "no_bets")
+        },
+    )
+    updated = await db.execute(
+        stmt.returning(*EventStats.__table__.columns),
+        [
+            {"event_request_id": event_request_id, **delta}
+            for event_request_id, delta in sorted(deltas.items())
+        ],
+    )
+    return {row.event_request_id: dict(row._mapping) for row in updated}
+
+
+async def record_wallet_bets(db: AsyncSession, wallet_deltas):
+    stmt = upsert_insert(db, WalletStats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            WalletStats.wallet_address,
+            WalletStats.event_request_id,
+            WalletStats.token_name,
+        ],
+        set_={
+            column: getattr(WalletStats, column) + getattr(stmt.excluded, column)
+            for column in ("total_bets", "total_tokens", "yes_tokens", "no_tokens")
+        },
+    )
+    await db.execute(
+        stmt,
+        [
+            {
+                "wallet_address": wallet_address,
+                "event_request_id": event_request_id,
+                "token_name": token_name,
+                **delta,
+            }
+            for (wallet_address, event_request_id, token_name), delta in sorted(wallet_deltas.items())
+        ],
+    )
+
+
+async def rebuild_event_stats(db: AsyncSession):
+    await db.execute(delete(EventStats))
+    await db.execute(
+        insert(EventStats).from_select(
+            ["event_request_id", "total_bets", "total_tokens", "yes_bets", "no_bets"],
+            select(
+                Bet.event_request_id,
+                func.count(),
+                func.coalesce(func.sum(Bet.tokens), 0),
+                func.sum(case((Bet.prediction == "YES", 1), else_=0)),
+                func.sum(case((Bet.prediction == "NO", 1), else_=0)),
+            ).group_by(Bet.event_request_id),
+        )
+    )
+
+
+async def rebuild_wallet_stats(db: AsyncSession):
+    await db.execute(delete(WalletStats))
+    await db.execute(
+        insert(WalletStats).from_select(
+            [
+                "wallet_address",
+                "event_request_id",
+                "token_name",
+                "total_bets",
+                "total_tokens",
+                "yes_tokens",
+                "no_tokens",
+            ],
+            select(
+                Bet.wallet_address,
+                Bet.event_request_id,
+                Bet.token_name,
+                func.count(),
+                func.coalesce(func.sum(Bet.tokens), 0),
+                func.coalesce(func.sum(case((Bet.prediction == "YES", Bet.tokens), else_=0)), 0),
+                func.coalesce(func.sum(case((Bet.prediction == "NO", Bet.tokens), else_=0)), 0),
+            ).group_by(Bet.wallet_address, Bet.event_request_id, Bet.token_name),
+        )
+    )
+
+
+async def main():
+    await upgrade_schema()
+    async with AsyncSessionLocal() as db:
+        await rebuild_event_stats(db)
+        await rebuild_wallet_stats(db)
+        await db.commit()
+        rows = await db.scalar(select(func.count()).select_from(EventStats))
+        wallets = await db.scalar(
+            select(func.count(func.distinct(WalletStats.wallet_address)))
+        )
+    await engine.dispose()
+    print(f"Rebuilt statistics for {rows} events and {wallets} wallets")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,7 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# payouts imports database, which needs a URL to build its engine.
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
@@ -0,0 +1,40 @@
+import pytest
+
+import merkle
+
+
+def wallet(i: int) -> str:
+    return "0x" + f"{i:040x}"
+
+
+def rebuild_root(leaf: bytes, siblings: list[bytes]) -> bytes:
+    node = leaf
+    for sibling in siblings:
+        node = merkle.hash_pair(node, sibling)
+    return node
+
+
+@pytest.mark.parametrize("leaf_count", [1, 2, 3, 4, 5, 7, 8, 9, 13, 16, 33])
+def test_proof_round_trip(leaf_count):
+    entries = [(wallet(i + 1), (i + 1) * 10**18) for i in range(leaf_count)]
+    nodes = merkle.build_tree(entries)
+    root = merkle.root(nodes)
+    for address, amount in entries:
+        leaf = merkle.leaf_hash(address, amount)
+        index = merkle.leaf_index(nodes, leaf_count, leaf)
+        assert index is not None
+        assert rebuild_root(leaf, merkle.proof(nodes, leaf_count, index)) == root
+
+
+def test_leaf_index_misses_unknown_leaf():
+    entries = [(wallet(i + 1), 1) for i in range(5)]
+    nodes = merkle.build_tree(entries)
+    assert merkle.leaf_index(nodes, len(entries), merkle.leaf_hash(wallet(99), 1)) is None
+    assert merkle.leaf_index(nodes, len(entries), merkle.leaf_hash(wallet(1), 2)) is None
+
+
+def test_address_bytes_rejects_non_addresses():
+    for value in ("0x1234", "wallet", wallet(1)[2:], "0x" + "g" * 40):
+        assert not merkle.is_address(value)
+        with pytest.raises(ValueError):
+            merkle.address_bytes(value)
@@ -0,0 +1,72 @@
+import pytest
+
+import payouts
+
+
+def as_dict(result: dict) -> dict:
+    return {
+        (str(wallet), str(token)): float(amount)
+        for wallet, token, amount in zip(
+            result["wallet_address"], result["token_name"], result["amount"]
+        )
+    }
+
+
+def test_to_units_rounds_down(monkeypatch):
+    monkeypatch.setattr(payouts, "PAYOUT_DECIMALS", 18)
+    assert payouts.to_units(1.0) == 10**18
+    assert payouts.to_units(0.1) == 10**17
+    assert payouts.to_units(1.9e-18) == 1
+    assert payouts.to_units(0.9e-18) == 0
+    monkeypatch.setattr(payouts, "PAYOUT_DECIMALS", 2)
+    assert payouts.to_units(2 / 3) == 66
+    assert payouts.to_units(0.999) == 99
+
+
+def test_compute_payouts_splits_pool_between_winners():
+    result, summary = payouts.compute_payouts(
+        ["a", "b", "c"], ["YES", "YES", "NO"], [10.0, 30.0, 60.0], ["USDC"] * 3, "YES"
+    )
+    assert as_dict(result) == {("a", "USDC"): pytest.approx(25.0), ("b", "USDC"): pytest.approx(75.0)}
+    assert summary["total_bets"] == 3
+    assert summary["winning_bets"] == 2
+    assert summary["payouts"] == 2
+    assert summary["pools"] == {"USDC": {"total_pool": 100.0, "winning_pool": 40.0}}
+
+
+def test_compute_payouts_refunds_pool_nobody_won():
+    result, summary = payouts.compute_payouts(
+        ["a", "b", "a"], ["NO", "NO", "NO"], [5.0, 7.0, 1.0], ["USDC"] * 3, "YES"
+    )
+    assert as_dict(result) == {("a", "USDC"): 6.0, ("b", "USDC"): 7.0}
+    assert summary["winning_bets"] == 0
+    assert summary["pools"]["USDC"]["winning_pool"] == 0.0
+
+
+def test_compute_payouts_keeps_token_pools_apart():
+    result, summary = payouts.compute_payouts(
+        ["a", "b", "a", "c", "d"],
+        ["YES", "NO", "NO", "NO", "YES"],
+        [10.0, 10.0, 4.0, 6.0, 3.0],
+        ["USDC", "USDC", "DAI", "DAI", "WETH"],
+        "YES",
+    )
+    assert as_dict(result) == {
+        ("a", "USDC"): pytest.approx(20.0),
+        # Nobody bet YES in DAI, so it is refunded.
+        ("a", "DAI"): 4.0,
+        ("c", "DAI"): 6.0,
+        ("d", "WETH"): pytest.approx(3.0),
+    }
+    assert summary["pools"] == {
+        "DAI": {"total_pool": 10.0, "winning_pool": 0.0},
+        "USDC": {"total_pool": 20.0, "winning_pool": 10.0},
+        "WETH": {"total_pool": 3.0, "winning_pool": 3.0},
+    }
+
+
+def test_compute_payouts_without_bets():
+    result, summary = payouts.compute_payouts([], [], [], [], "YES")
+    assert as_dict(result) == {}
+    assert summary["total_bets"] == 0
+    assert summary["pools"] == {}